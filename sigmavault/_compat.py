@@ -0,0 +1,9 @@
+"""
+Python version compatibility helpers shared across the sigmavault package.
+"""
+
+import sys
+
+# Keyword arguments giving dataclasses __slots__ storage where supported
+# (Python 3.10+); use as ``@dataclass(**DATACLASS_SLOTS)``.
+DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
@@ -58,6 +58,7 @@ from enum import IntEnum, auto
 from pathlib import Path
 import time
 import io
+from functools import lru_cache
 
 # Import security hardening utilities
 try:
@@ -145,6 +146,18 @@ class DimensionalCoordinate:
         return cls(*values)
 
 
+@lru_cache(maxsize=128)
+def _expand_hybrid_key(hybrid_key: bytes) -> bytes:
+    """
+    Run the KeyState key-stretching KDF, memoized per hybrid key.
+    
+    The expansion is pure, so repeated derivations of the same key
+    (re-opening a vault, re-deriving across shards) become a dict lookup
+    instead of another 100k-iteration PBKDF2 run.
+    """
+    return hashlib.pbkdf2_hmac('sha512', hybrid_key, b'SIGMAVAULT_EXPAND', 100000)
+
+
 @dataclass
 class KeyState:
     """
@@ -162,8 +175,8 @@ class KeyState:
     @classmethod
     def derive(cls, hybrid_key: bytes) -> 'KeyState':
         """Derive key state from hybrid key."""
-        # Expand key through HKDF-like expansion
-        expanded = hashlib.pbkdf2_hmac('sha512', hybrid_key, b'SIGMAVAULT_EXPAND', 100000)
+        # Expand key through HKDF-like expansion (cached per key)
+        expanded = _expand_hybrid_key(bytes(hybrid_key))
         
         # Extract components
         return cls(
@@ -175,6 +188,11 @@ class KeyState:
             scatter_depth=3 + (expanded[57] % 5),  # 3 to 7
             topology_seed=int.from_bytes(expanded[58:66], 'big'),
         )
+    
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop all memoized key expansions (key material) from memory."""
+        _expand_hybrid_key.cache_clear()
 
 
 # ============================================================================
@@ -534,24 +552,30 @@ class HolographicRedundancy:
         self.key_state = key_state
         self.redundancy_factor = redundancy_factor
     
-    def create_shards(self, data: bytes, num_shards: int = 8) -> List[bytes]:
+    def create_shards(self, data: bytes, num_shards: int = 8) -> List[memoryview]:
         """
         Create shards by simple splitting with XOR parity.
         Each shard contains a portion of the data.
-        """
-        # Pad to multiple of num_shards
-        pad_size = (num_shards - len(data) % num_shards) % num_shards
-        padded_data = data + bytes(pad_size)
         
-        shard_size = len(padded_data) // num_shards
-        shards = []
-        
-        for i in range(num_shards):
-            start = i * shard_size
-            end = start + shard_size
-            shards.append(padded_data[start:end])
-        
-        return shards
+        Shards are memoryview rows of a single (num_shards, -1) uint8
+        array rather than N separately allocated byte slices. For
+        immutable ``bytes`` input (unpadded) the rows alias ``data``
+        read-only and keep it alive; mutable buffers such as
+        ``bytearray`` are copied once so later writes by the caller
+        cannot change the shards.
+        """
+        arr = np.frombuffer(data, dtype=np.uint8)
+        if arr.flags.writeable:
+            arr = arr.copy()
+        
+        # Pad to multiple of num_shards (only copies when padding is needed)
+        padded_len = -(-len(arr) // num_shards) * num_shards
+        if padded_len != len(arr):
+            padded = np.zeros(padded_len, dtype=np.uint8)
+            padded[:len(arr)] = arr
+            arr = padded
+        
+        return [memoryview(row) for row in arr.reshape(num_shards, -1)]
     
     def reconstruct(self, shards: List[Optional[bytes]], 
                     original_size: int) -> Optional[bytes]:
@@ -13,10 +13,15 @@ Features:
 
 import os
 import re
+import sys
+import threading
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from enum import Enum, auto
+from functools import lru_cache
+from ..._compat import DATACLASS_SLOTS
 
 
 class ContainerRuntime(Enum):
@@ -33,9 +38,109 @@ class ContainerRuntime(Enum):
     UNKNOWN = auto()     # Unknown container type
 
 
-@dataclass
+# One pass over cgroup content: a runtime marker, then an optional hex ID.
+# systemd scope forms (docker-<id>.scope, crio-<id>.scope, ...) require the
+# ID so host daemon units (docker.service, containerd.service,
+# crio-wipe.service, lxc.service) don't read as containers.
+_CGROUP_RE = re.compile(
+    rb'(?:(?P<docker>/docker/|/docker-(?=[0-9a-f]{12}))'
+    rb'|(?P<kubepods>kubepods[-/.]?)'
+    rb'|(?P<libpod>/libpod-)'
+    rb'|(?P<lxc>/lxc/|/lxc\.payload[./])'
+    rb'|(?P<crio>/crio-(?=[0-9a-f]{12}))'
+    rb'|(?P<containerd>/containerd/|/containerd-(?=[0-9a-f]{12})))'
+    rb'(?P<id>[0-9a-f]{12,64})?'
+)
+
+# mountinfo line for the root mount ("/" mount point, 5th field) backed by
+# Docker storage, e.g. overlay lowerdir=/var/lib/docker/overlay2/...
+_DOCKER_ROOT_MOUNT_RE = re.compile(rb'^\S+ \S+ \S+ \S+ / .*/docker/', re.MULTILINE)
+
+# Docker ID after /docker/ or docker- (systemd scope): full 64-char ID
+# preferred, else the 12-char short ID, in a single scan
+_DOCKER_ID_RE = re.compile(r'/docker[/-](?:(?P<long>[a-f0-9]{64})|(?P<short>[a-f0-9]{12}))')
+
+# Docker sets the hostname to the 12-char short ID
+_SHORT_ID_RE = re.compile(r'[a-f0-9]{12}')
+
+# Effective capability mask in /proc/self/status
+_CAP_EFF_RE = re.compile(rb'CapEff:\s+([0-9a-f]+)')
+
+_CGROUP_RUNTIMES = {
+    'docker': ContainerRuntime.DOCKER,
+    'kubepods': ContainerRuntime.KUBERNETES,
+    'libpod': ContainerRuntime.PODMAN,
+    'lxc': ContainerRuntime.LXC,
+    'crio': ContainerRuntime.CRIO,
+    'containerd': ContainerRuntime.CONTAINERD,
+}
+
+
+def _slurp_proc(path: str) -> bytes:
+    """
+    Read a proc/sys file as bytes with raw ``os.read`` calls.
+    
+    Skips the buffered/text I/O layers of ``open()``; these files are
+    small ASCII and usually arrive in a single read.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        chunks = []
+        while True:
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        os.close(fd)
+    return b''.join(chunks)
+
+
+def _parse_limit(value: bytes) -> Optional[int]:
+    """
+    Parse a cgroup limit value, returning None for ``max`` (unlimited).
+    
+    ``int()`` accepts bytes and ignores surrounding whitespace, so the raw
+    file contents are parsed without decoding or stripping.
+    """
+    if value.startswith(b'max'):
+        return None
+    return int(value)
+
+
+@lru_cache(maxsize=256)
+def _classify_cgroup(content: bytes) -> Tuple[ContainerRuntime, Optional[str]]:
+    """Runtime and container ID for cgroup file content (memoized)."""
+    match = _CGROUP_RE.search(content)
+    if match is None:
+        return ContainerRuntime.NONE, None
+    
+    container_id = match.group('id')
+    if container_id is not None:
+        container_id = container_id.decode('ascii')
+    for tag, runtime in _CGROUP_RUNTIMES.items():
+        if match.group(tag) is not None:
+            return runtime, container_id
+    return ContainerRuntime.NONE, None
+
+
+@lru_cache(maxsize=256)
+def _docker_id_from_cgroup(cgroup_content: str) -> Optional[str]:
+    """Docker container ID in cgroup content (memoized)."""
+    match = _DOCKER_ID_RE.search(cgroup_content)
+    if match is None:
+        return None
+    return match.group('long') or match.group('short')
+
+
+@dataclass(frozen=True, **DATACLASS_SLOTS)
 class ContainerInfo:
-    """Information about the container environment."""
+    """
+    Information about the container environment.
+    
+    Immutable (and slotted on 3.10+): a detection result is shared by
+    every caller, and is hashable for use as a cache key.
+    """
     
     runtime: ContainerRuntime
     runtime_version: Optional[str] = None
@@ -52,25 +157,38 @@ class ContainerInfo:
     privileged: bool = False
     
     # Namespace info
-    namespaces: List[str] = field(default_factory=list)
+    namespaces: List[str] = field(default_factory=list, hash=False)
     
     # Environment hints
-    env_hints: Dict[str, str] = field(default_factory=dict)
+    env_hints: Dict[str, str] = field(default_factory=dict, hash=False)
+    
+    # Derived values, computed once in __post_init__ (fields are immutable)
+    _is_containerized: bool = field(init=False, repr=False, compare=False)
+    _has_resource_limits: bool = field(init=False, repr=False, compare=False)
+    _runtime_name: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, '_is_containerized', self.runtime != ContainerRuntime.NONE)
+        object.__setattr__(
+            self, '_has_resource_limits',
+            self.memory_limit_bytes is not None or self.cpu_limit_cores is not None,
+        )
+        object.__setattr__(self, '_runtime_name', self.runtime.name.lower())
     
     @property
     def is_containerized(self) -> bool:
         """Return True if running in any container."""
-        return self.runtime != ContainerRuntime.NONE
+        return self._is_containerized
     
     @property
     def has_resource_limits(self) -> bool:
         """Return True if container has resource limits."""
-        return self.memory_limit_bytes is not None or self.cpu_limit_cores is not None
+        return self._has_resource_limits
     
     @property
     def runtime_name(self) -> str:
         """Return human-readable runtime name."""
-        return self.runtime.name.lower()
+        return self._runtime_name
 
 
 class ContainerDetector:
@@ -83,6 +201,10 @@ class ContainerDetector:
     - cgroup information
     - Process tree analysis
     - Namespace detection
+    
+    Filesystem probes go through ``_exists``/``_read_proc``, which memoize
+    into ``_fs_snapshot`` so that one ``detect()`` stats or reads each
+    path at most once however many subchecks consult it.
     """
     
     # Environment variable hints for container runtimes
@@ -99,6 +221,9 @@ class ContainerDetector:
     def __init__(self):
         """Initialize container detector."""
         self._cached_info: Optional[ContainerInfo] = None
+        # (probe, path) -> result, valid for one detection pass
+        self._fs_snapshot: Dict[Tuple[str, str], Any] = {}
+        self._cgroup_version: Optional[int] = None
     
     def detect(self, force_refresh: bool = False) -> ContainerInfo:
         """
@@ -113,6 +238,8 @@ class ContainerDetector:
         if self._cached_info is not None and not force_refresh:
             return self._cached_info
         
+        self._fs_snapshot = {}
+        
         runtime = ContainerRuntime.NONE
         runtime_version = None
         container_id = None
@@ -121,6 +248,12 @@ class ContainerDetector:
         # 1. Check environment variables
         runtime, env_hints = self._check_environment()
         
+        # Containers are Linux-only: with no env hints elsewhere, none of
+        # the filesystem/cgroup probes below can find anything
+        if runtime == ContainerRuntime.NONE and not env_hints and sys.platform != 'linux':
+            self._cached_info = ContainerInfo(runtime=ContainerRuntime.NONE)
+            return self._cached_info
+        
         # 2. Check filesystem markers
         if runtime == ContainerRuntime.NONE:
             runtime = self._check_filesystem_markers()
@@ -161,6 +294,49 @@ class ContainerDetector:
         
         return self._cached_info
     
+    def _exists(self, path: str) -> bool:
+        """Memoized existence check; unreadable paths count as absent."""
+        key = ('exists', path)
+        try:
+            return self._fs_snapshot[key]
+        except KeyError:
+            pass
+        try:
+            result = Path(path).exists()
+        except OSError:
+            result = False
+        self._fs_snapshot[key] = result
+        return result
+    
+    def _read_proc(self, path: str) -> Optional[bytes]:
+        """Memoized raw read of a small proc/sys file; None if unreadable."""
+        key = ('read', path)
+        try:
+            return self._fs_snapshot[key]
+        except KeyError:
+            pass
+        try:
+            content = _slurp_proc(path)
+        except OSError:
+            content = None
+        self._fs_snapshot[key] = content
+        return content
+    
+    def _list_dir(self, path: str) -> Optional[frozenset]:
+        """Memoized directory listing (one scandir pass); None if unreadable."""
+        key = ('list_dir', path)
+        try:
+            return self._fs_snapshot[key]
+        except KeyError:
+            pass
+        try:
+            with os.scandir(path) as it:
+                names = frozenset(entry.name for entry in it)
+        except OSError:
+            names = None
+        self._fs_snapshot[key] = names
+        return names
+    
     def _check_environment(self) -> Tuple[ContainerRuntime, Dict[str, str]]:
         """Check environment variables for container hints."""
         hints: Dict[str, str] = {}
@@ -197,83 +373,51 @@ class ContainerDetector:
     def _check_filesystem_markers(self) -> ContainerRuntime:
         """Check filesystem for container markers."""
         # Docker marker
-        if Path('/.dockerenv').exists():
+        if self._exists('/.dockerenv'):
             return ContainerRuntime.DOCKER
         
         # Podman marker
-        if Path('/run/.containerenv').exists():
+        if self._exists('/run/.containerenv'):
             return ContainerRuntime.PODMAN
         
         # LXC marker
-        if Path('/dev/lxc').exists():
+        if self._exists('/dev/lxc'):
             return ContainerRuntime.LXC
         
         return ContainerRuntime.NONE
     
     def _check_cgroups(self) -> Tuple[ContainerRuntime, Optional[str]]:
-        """Check cgroup for container information."""
+        """
+        Check cgroup for container information.
+        
+        Each cgroup file is read once as bytes and scanned with a single
+        compiled alternation; the first runtime marker found wins.
+        """
         cgroup_paths = [
             '/proc/1/cgroup',
             '/proc/self/cgroup',
         ]
         
         for cgroup_path in cgroup_paths:
-            try:
-                with open(cgroup_path, 'r') as f:
-                    content = f.read()
-                    
-                    # Docker
-                    if '/docker/' in content:
-                        container_id = self._extract_docker_id(content)
-                        return ContainerRuntime.DOCKER, container_id
-                    
-                    # Kubernetes
-                    if '/kubepods/' in content or 'kubepods' in content:
-                        return ContainerRuntime.KUBERNETES, None
-                    
-                    # Podman
-                    if '/libpod-' in content:
-                        return ContainerRuntime.PODMAN, None
-                    
-                    # LXC
-                    if '/lxc/' in content:
-                        return ContainerRuntime.LXC, None
-                    
-                    # containerd
-                    if '/containerd/' in content:
-                        return ContainerRuntime.CONTAINERD, None
-                    
-                    # CRI-O
-                    if '/crio-' in content:
-                        return ContainerRuntime.CRIO, None
-                        
-            except (FileNotFoundError, PermissionError):
+            content = self._read_proc(cgroup_path)
+            if content is None:
                 continue
+            
+            runtime, container_id = _classify_cgroup(content)
+            if runtime != ContainerRuntime.NONE:
+                return runtime, container_id
         
-        # Check cgroup v2
-        try:
-            with open('/proc/self/mountinfo', 'r') as f:
-                content = f.read()
-                if 'docker' in content:
-                    return ContainerRuntime.DOCKER, None
-        except (FileNotFoundError, PermissionError):
-            pass
+        # Check cgroup v2: root filesystem on Docker storage (a host
+        # running dockerd also lists container mounts, but not as "/")
+        content = self._read_proc('/proc/self/mountinfo')
+        if content is not None and _DOCKER_ROOT_MOUNT_RE.search(content):
+            return ContainerRuntime.DOCKER, None
         
         return ContainerRuntime.NONE, None
     
     def _extract_docker_id(self, cgroup_content: str) -> Optional[str]:
         """Extract Docker container ID from cgroup content."""
-        # Pattern: /docker/<container_id>
-        match = re.search(r'/docker/([a-f0-9]{64})', cgroup_content)
-        if match:
-            return match.group(1)
-        
-        # Short ID pattern
-        match = re.search(r'/docker/([a-f0-9]{12})', cgroup_content)
-        if match:
-            return match.group(1)
-        
-        return None
+        return _docker_id_from_cgroup(cgroup_content)
     
     def _get_container_id(self, runtime: ContainerRuntime) -> Optional[str]:
         """Get container ID based on runtime."""
@@ -285,67 +429,91 @@ class ContainerDetector:
             import socket
             hostname = socket.gethostname()
             # Docker short IDs are 12 hex chars
-            if re.match(r'^[a-f0-9]{12}$', hostname):
+            if _SHORT_ID_RE.fullmatch(hostname):
                 return hostname
         except Exception:
             pass
         
         return None
     
+    def _get_cgroup_version(self) -> int:
+        """cgroup hierarchy version (1 or 2), probed once per detector."""
+        if self._cgroup_version is None:
+            # cgroup.controllers only exists at the root of a v2 unified hierarchy
+            unified = self._exists('/sys/fs/cgroup/cgroup.controllers')
+            self._cgroup_version = 2 if unified else 1
+        return self._cgroup_version
+    
     def _detect_resource_limits(self) -> Tuple[
         Optional[int], Optional[float], Optional[int], Optional[int]
     ]:
-        """Detect container resource limits from cgroups."""
+        """
+        Detect container resource limits from cgroups.
+        
+        Only the file set of the host's cgroup version is read.
+        
+        Returns:
+            (memory_limit_bytes, cpu_limit_cores, cpu_quota_us, cpu_period_us)
+        """
+        if self._get_cgroup_version() == 2:
+            return self._read_limits_v2()
+        return self._read_limits_v1()
+    
+    def _read_limits_v2(self) -> Tuple[
+        Optional[int], Optional[float], Optional[int], Optional[int]
+    ]:
+        """Resource limits from the cgroup v2 memory.max and cpu.max files."""
         memory_limit = None
         cpu_limit = None
         cpu_quota = None
         cpu_period = None
         
-        # cgroup v2 paths
-        cgroup_v2_paths = {
-            'memory_max': '/sys/fs/cgroup/memory.max',
-            'cpu_max': '/sys/fs/cgroup/cpu.max',
-        }
+        value = self._read_proc('/sys/fs/cgroup/memory.max')
+        if value is not None:
+            try:
+                memory_limit = _parse_limit(value)
+            except ValueError:
+                pass
         
-        # cgroup v1 paths
-        cgroup_v1_paths = {
-            'memory_limit': '/sys/fs/cgroup/memory/memory.limit_in_bytes',
-            'cpu_quota': '/sys/fs/cgroup/cpu/cpu.cfs_quota_us',
-            'cpu_period': '/sys/fs/cgroup/cpu/cpu.cfs_period_us',
-        }
+        # cpu.max: "<quota|max> <period>"
+        value = self._read_proc('/sys/fs/cgroup/cpu.max')
+        if value is not None:
+            quota_b, _, period_b = value.partition(b' ')
+            try:
+                cpu_quota = _parse_limit(quota_b)
+                if cpu_quota is not None:
+                    cpu_period = int(period_b) if period_b.strip() else 100000
+                    cpu_limit = cpu_quota / cpu_period
+            except (ValueError, ZeroDivisionError):
+                cpu_quota = cpu_period = None
         
-        # Try cgroup v2 first
-        try:
-            with open(cgroup_v2_paths['memory_max'], 'r') as f:
-                value = f.read().strip()
-                if value != 'max':
-                    memory_limit = int(value)
-        except (FileNotFoundError, PermissionError, ValueError):
-            # Try cgroup v1
+        return memory_limit, cpu_limit, cpu_quota, cpu_period
+    
+    def _read_limits_v1(self) -> Tuple[
+        Optional[int], Optional[float], Optional[int], Optional[int]
+    ]:
+        """Resource limits from the cgroup v1 memory and cpu controllers."""
+        memory_limit = None
+        cpu_limit = None
+        cpu_quota = None
+        cpu_period = None
+        
+        value = self._read_proc('/sys/fs/cgroup/memory/memory.limit_in_bytes')
+        if value is not None:
             try:
-                with open(cgroup_v1_paths['memory_limit'], 'r') as f:
-                    memory_limit = int(f.read().strip())
-            except (FileNotFoundError, PermissionError, ValueError):
+                memory_limit = int(value)
+            except ValueError:
                 pass
         
-        # CPU limits
-        try:
-            with open(cgroup_v2_paths['cpu_max'], 'r') as f:
-                parts = f.read().strip().split()
-                if parts[0] != 'max':
-                    cpu_quota = int(parts[0])
-                    cpu_period = int(parts[1]) if len(parts) > 1 else 100000
-                    cpu_limit = cpu_quota / cpu_period
-        except (FileNotFoundError, PermissionError, ValueError):
-            # Try cgroup v1
+        quota = self._read_proc('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')
+        period = self._read_proc('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+        if quota is not None and period is not None:
             try:
-                with open(cgroup_v1_paths['cpu_quota'], 'r') as f:
-                    cpu_quota = int(f.read().strip())
-                with open(cgroup_v1_paths['cpu_period'], 'r') as f:
-                    cpu_period = int(f.read().strip())
+                cpu_quota = int(quota)
+                cpu_period = int(period)
                 if cpu_quota > 0 and cpu_period > 0:
                     cpu_limit = cpu_quota / cpu_period
-            except (FileNotFoundError, PermissionError, ValueError):
+            except ValueError:
                 pass
         
         return memory_limit, cpu_limit, cpu_quota, cpu_period
@@ -353,7 +521,7 @@ class ContainerDetector:
     def _check_fuse_in_container(self) -> bool:
         """Check if FUSE is available in the container."""
         # Check for /dev/fuse device
-        if not Path('/dev/fuse').exists():
+        if not self._exists('/dev/fuse'):
             return False
         
         # Check if we can actually use it
@@ -368,47 +536,42 @@ class ContainerDetector:
     def _check_privileged(self) -> bool:
         """Check if container is running in privileged mode."""
         # Privileged containers typically have access to all devices
-        if not Path('/dev').exists():
+        if not self._exists('/dev'):
             return False
         
         # Check for common privileged-mode indicators
         indicators = [
             # Access to all host devices
-            Path('/dev/sda'),
-            Path('/dev/mem'),
+            '/dev/sda',
+            '/dev/mem',
             # Docker socket
-            Path('/var/run/docker.sock'),
+            '/var/run/docker.sock',
             # Host PID namespace
-            Path('/proc/1/root') if os.path.islink('/proc/1/root') else None,
+            '/proc/1/root' if os.path.islink('/proc/1/root') else None,
         ]
         
         for indicator in indicators:
-            if indicator and indicator.exists():
+            if indicator and self._exists(indicator):
                 return True
         
         # Check capabilities (if we have CAP_SYS_ADMIN, likely privileged)
-        try:
-            with open('/proc/self/status', 'r') as f:
-                content = f.read()
-                # CapEff line contains effective capabilities
-                match = re.search(r'CapEff:\s+([0-9a-f]+)', content)
-                if match:
-                    cap_eff = int(match.group(1), 16)
-                    # CAP_SYS_ADMIN is bit 21
-                    if cap_eff & (1 << 21):
-                        return True
-        except (FileNotFoundError, PermissionError):
-            pass
+        content = self._read_proc('/proc/self/status')
+        if content is not None:
+            # CapEff line contains effective capabilities
+            match = _CAP_EFF_RE.search(content)
+            if match:
+                cap_eff = int(match.group(1), 16)
+                # CAP_SYS_ADMIN is bit 21
+                if cap_eff & (1 << 21):
+                    return True
         
         return False
     
     def _detect_namespaces(self) -> List[str]:
         """Detect which namespaces are in use."""
-        namespaces = []
-        ns_path = Path('/proc/self/ns')
-        
-        if not ns_path.exists():
-            return namespaces
+        entries = self._list_dir('/proc/self/ns')
+        if entries is None:
+            return []
         
         namespace_types = [
             'mnt',    # Mount namespace
@@ -421,16 +584,30 @@ class ContainerDetector:
             'time',   # Time namespace (Linux 5.6+)
         ]
         
-        for ns_type in namespace_types:
-            ns_file = ns_path / ns_type
-            if ns_file.exists():
-                namespaces.append(ns_type)
-        
-        return namespaces
+        return [ns_type for ns_type in namespace_types if ns_type in entries]
 
 
 # Global singleton
-_detector = ContainerDetector()
+# Process-wide detector and detection result shared by the module-level
+# helpers. The result carries an expiry so long-lived processes eventually
+# notice a changed environment (e.g. updated cgroup limits).
+_DETECTOR: Optional[ContainerDetector] = None
+_DETECT_LOCK = threading.Lock()
+_CACHED_INFO: Optional[Tuple[ContainerInfo, float]] = None
+_CACHE_TTL_SECONDS = 60.0
+
+
+def _get_detector() -> ContainerDetector:
+    """Return the shared ContainerDetector, creating it on first use."""
+    global _DETECTOR
+    
+    detector = _DETECTOR
+    if detector is None:
+        with _DETECT_LOCK:
+            if _DETECTOR is None:
+                _DETECTOR = ContainerDetector()
+            detector = _DETECTOR
+    return detector
 
 
 def detect_container() -> ContainerInfo:
@@ -438,7 +615,8 @@ def detect_container() -> ContainerInfo:
     Detect container environment.
     
     This is the main entry point for container detection.
-    Results are cached for performance.
+    Results are cached for performance (for ``_CACHE_TTL_SECONDS``):
+    concurrent callers share a single detection.
     
     Returns:
         ContainerInfo with detection results.
@@ -450,7 +628,21 @@ def detect_container() -> ContainerInfo:
         ...     if info.memory_limit_bytes:
         ...         print(f"Memory limit: {info.memory_limit_bytes / (1024**3):.1f} GB")
     """
-    return _detector.detect()
+    global _CACHED_INFO
+    
+    cached = _CACHED_INFO
+    if cached is not None and time.monotonic() < cached[1]:
+        return cached[0]
+    
+    detector = _get_detector()
+    with _DETECT_LOCK:
+        cached = _CACHED_INFO
+        now = time.monotonic()
+        if cached is None or now >= cached[1]:
+            info = detector.detect(force_refresh=cached is not None)
+            cached = (info, now + _CACHE_TTL_SECONDS)
+            _CACHED_INFO = cached
+    return cached[0]
 
 
 def is_containerized() -> bool:
@@ -1,12 +1,13 @@
 """ΣVAULT RSU Storage Module"""
 
-from .storage import RSUStorage, RSUStorageConfig
+from .storage import RSUStorage, RSUStorageConfig, StoreSpec
 from .manifest import RSUManifest, RSUEntry, RSUStatus
 from .retrieval import RSURetriever, RetrievalResult
 
 __all__ = [
     "RSUStorage",
     "RSUStorageConfig",
+    "StoreSpec",
     "RSUManifest",
     "RSUEntry",
     "RSUStatus",
@@ -10,6 +10,7 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 import json
+from .._compat import DATACLASS_SLOTS
 
 
 class RSUStatus(Enum):
@@ -20,7 +21,7 @@ class RSUStatus(Enum):
     CORRUPTED = "corrupted"
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class RSUEntry:
     """
     Single RSU entry in the manifest.
@@ -149,6 +150,36 @@ class RSUManifest:
         self.total_compressed_glyphs += entry.compressed_glyph_count
         self.total_kv_cache_bytes += entry.kv_cache_size_bytes
     
+    def add_entries(self, entries: List[RSUEntry]) -> None:
+        """Add a batch of RSU entries to manifest."""
+        for entry in entries:
+            self.add_entry(entry)
+    
+    def remove_entry(self, rsu_id: str) -> Optional[RSUEntry]:
+        """Remove RSU entry and its index references from manifest."""
+        entry = self.entries.pop(rsu_id, None)
+        if entry is None:
+            return None
+        
+        rsu_ids = self.semantic_index.get(entry.semantic_hash)
+        if rsu_ids is not None:
+            rsu_ids.remove(rsu_id)
+            if not rsu_ids:
+                del self.semantic_index[entry.semantic_hash]
+        
+        if entry.conversation_id:
+            rsu_ids = self.conversation_index.get(entry.conversation_id)
+            if rsu_ids is not None:
+                rsu_ids.remove(rsu_id)
+                if not rsu_ids:
+                    del self.conversation_index[entry.conversation_id]
+        
+        self.total_original_tokens -= entry.original_token_count
+        self.total_compressed_glyphs -= entry.compressed_glyph_count
+        self.total_kv_cache_bytes -= entry.kv_cache_size_bytes
+        
+        return entry
+    
     def get_entry(self, rsu_id: str) -> Optional[RSUEntry]:
         """Get RSU entry by ID."""
         return self.entries.get(rsu_id)
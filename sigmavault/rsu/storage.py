@@ -6,11 +6,13 @@ Stores RSUs using ΣVAULT's 8-dimensional encrypted storage.
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, Tuple, List, Any
+from typing import Optional, Tuple, List, Any, Sequence
 from datetime import datetime
 import hashlib
 import uuid
 
+import numpy as np
+
 from .manifest import RSUManifest, RSUEntry, RSUStatus
 
 
@@ -47,6 +49,18 @@ class StoredRSU:
     kv_cache_data: Optional[bytes] = None
 
 
+@dataclass
+class StoreSpec:
+    """Arguments for one RSU in a :meth:`RSUStorage.store_many` batch."""
+    
+    glyph_data: bytes
+    semantic_hash: int
+    original_token_count: int
+    kv_cache_data: Optional[bytes] = None
+    conversation_id: Optional[str] = None
+    parent_rsu_id: Optional[str] = None
+
+
 class MockVault:
     """Mock vault for testing without external dependencies."""
     
@@ -57,6 +71,10 @@ class MockVault:
         """Store chunk."""
         self._chunks[chunk_id] = data
     
+    def store_chunks(self, chunks: List[Tuple[str, bytes, Tuple]]) -> None:
+        """Store many (chunk_id, data, coordinates) chunks."""
+        self._chunks.update((chunk_id, data) for chunk_id, data, _ in chunks)
+    
     def retrieve_chunk(self, chunk_id: str, coordinates: Tuple) -> Optional[bytes]:
         """Retrieve chunk."""
         return self._chunks.get(chunk_id)
@@ -69,6 +87,24 @@ class MockVault:
         return False
 
 
+_HASH_MASK = (1 << 64) - 1
+_COORD_DIMS = 8
+
+
+def _quantize_coordinates(coordinates: Sequence[float]) -> np.ndarray:
+    """Map [0, 1] manifold coordinates onto int8 [-127, 127]."""
+    scaled = np.asarray(coordinates, dtype=np.float64) * 254.0 - 127.0
+    return np.rint(np.clip(scaled, -127.0, 127.0)).astype(np.int8)
+
+
+def _popcount64(values: np.ndarray) -> np.ndarray:
+    """Per-element set-bit count of a uint64 array."""
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(values)
+    bits = np.unpackbits(values.view(np.uint8)).reshape(-1, 64)
+    return bits.sum(axis=1)
+
+
 class RSUStorage:
     """
     RSU storage using ΣVAULT.
@@ -85,6 +121,14 @@ class RSUStorage:
         self.config = config or RSUStorageConfig()
         self._vault = vault or MockVault()
         self._manifest = RSUManifest()
+        
+        # Packed per-RSU columns for vectorized search; slot i holds the
+        # semantic hash and int8-quantized coordinates of _slot_ids[i]
+        # (capacity grows by doubling)
+        self._hash_array = np.zeros(64, dtype=np.uint64)
+        self._coord_array = np.zeros((64, _COORD_DIMS), dtype=np.int8)
+        self._slot_ids: List[str] = []
+        self._slot_pos: dict = {}
     
     def store(
         self,
@@ -109,50 +153,83 @@ class RSUStorage:
         Returns:
             RSUEntry with storage metadata
         """
-        # Generate RSU ID
-        rsu_id = self._generate_rsu_id(semantic_hash)
-        
-        # Compute 8D coordinates
-        coordinates = self._compute_coordinates(semantic_hash, glyph_data)
-        
-        # Chunk and store data
-        chunk_ids = self._store_chunks(glyph_data, coordinates)
-        
-        # Store KV cache if provided
-        kv_cache_size = 0
-        kv_cache_layers = 0
-        if kv_cache_data:
-            kv_chunk_ids = self._store_chunks(kv_cache_data, coordinates, prefix="kv_")
-            chunk_ids.extend(kv_chunk_ids)
-            kv_cache_size = len(kv_cache_data)
-            kv_cache_layers = self._infer_kv_layers(kv_cache_data)
-        
-        # Create entry
-        entry = RSUEntry(
-            rsu_id=rsu_id,
+        return self.store_many([StoreSpec(
+            glyph_data=glyph_data,
             semantic_hash=semantic_hash,
             original_token_count=original_token_count,
-            compressed_glyph_count=len(glyph_data) // 2 if glyph_data else 0,
-            compression_ratio=original_token_count / (len(glyph_data) // 2) if glyph_data and len(glyph_data) > 0 else 1.0,
-            vault_coordinates=coordinates,
-            chunk_ids=chunk_ids,
-            has_kv_cache=kv_cache_data is not None,
-            kv_cache_layers=kv_cache_layers,
-            kv_cache_size_bytes=kv_cache_size,
+            kv_cache_data=kv_cache_data,
             conversation_id=conversation_id,
             parent_rsu_id=parent_rsu_id,
-        )
+        )])[0]
+    
+    def store_many(self, specs: Sequence[StoreSpec]) -> List[RSUEntry]:
+        """
+        Store a batch of RSUs in vault.
+        
+        Chunks for the whole batch are written to the vault in one call
+        (when the vault supports ``store_chunks``) and the manifest is
+        updated once, amortizing per-store overhead.
         
-        # Add to manifest
-        self._manifest.add_entry(entry)
+        Args:
+            specs: RSUs to store
         
-        # Update parent if exists
-        if parent_rsu_id:
-            parent = self._manifest.get_entry(parent_rsu_id)
-            if parent:
-                parent.child_rsu_ids.append(rsu_id)
+        Returns:
+            RSUEntry for each spec, in order
+        """
+        entries = []
+        pending: List[Tuple[str, bytes, Tuple[float, ...]]] = []
+        
+        for spec in specs:
+            glyph_data = spec.glyph_data
+            kv_cache_data = spec.kv_cache_data
+            
+            # Generate RSU ID
+            rsu_id = self._generate_rsu_id(spec.semantic_hash)
+            
+            # Compute 8D coordinates
+            coordinates = self._compute_coordinates(spec.semantic_hash, glyph_data)
+            
+            # Chunk data
+            chunk_ids = self._chunk(glyph_data, coordinates, pending)
+            
+            # Chunk KV cache if provided
+            kv_cache_size = 0
+            kv_cache_layers = 0
+            if kv_cache_data:
+                chunk_ids.extend(self._chunk(kv_cache_data, coordinates, pending, prefix="kv_"))
+                kv_cache_size = len(kv_cache_data)
+                kv_cache_layers = self._infer_kv_layers(kv_cache_data)
+            
+            entries.append(RSUEntry(
+                rsu_id=rsu_id,
+                semantic_hash=spec.semantic_hash,
+                original_token_count=spec.original_token_count,
+                compressed_glyph_count=len(glyph_data) // 2 if glyph_data else 0,
+                compression_ratio=spec.original_token_count / (len(glyph_data) // 2) if glyph_data and len(glyph_data) > 0 else 1.0,
+                vault_coordinates=coordinates,
+                chunk_ids=chunk_ids,
+                has_kv_cache=kv_cache_data is not None,
+                kv_cache_layers=kv_cache_layers,
+                kv_cache_size_bytes=kv_cache_size,
+                conversation_id=spec.conversation_id,
+                parent_rsu_id=spec.parent_rsu_id,
+            ))
+        
+        # Store all chunks via vault
+        self._write_chunks(pending)
+        
+        # Add to manifest and the packed search columns
+        self._manifest.add_entries(entries)
+        self._index_entries(entries)
+        
+        # Update parents if they exist
+        for entry in entries:
+            if entry.parent_rsu_id:
+                parent = self._manifest.get_entry(entry.parent_rsu_id)
+                if parent:
+                    parent.child_rsu_ids.append(entry.rsu_id)
         
-        return entry
+        return entries
     
     def retrieve(self, rsu_id: str) -> Optional[StoredRSU]:
         """
@@ -164,11 +241,9 @@ class RSUStorage:
         Returns:
             StoredRSU with data, or None if not found
         """
-        entry = self._manifest.get_entry(rsu_id)
-        if entry is None:
-            return None
-        
-        if entry.status != RSUStatus.ACTIVE:
+        # Archived/expired/corrupted RSUs keep their data but can't be retrieved
+        entry = self._manifest.entries.get(rsu_id)
+        if entry is None or entry.status is not RSUStatus.ACTIVE:
             return None
         
         # Retrieve chunks
@@ -213,15 +288,49 @@ class RSUStorage:
         Returns:
             List of similar RSU entries
         """
-        tolerance = 1.0 - threshold
-        matches = self._manifest.find_by_semantic_hash(semantic_hash, tolerance)
+        count = len(self._slot_ids)
+        if count == 0:
+            return []
         
-        # Sort by similarity and limit
-        matches.sort(
-            key=lambda e: -self._compute_similarity(semantic_hash, e.semantic_hash)
-        )
+        # XOR-popcount against every stored hash in one pass
+        target = np.uint64(semantic_hash & _HASH_MASK)
+        distance = _popcount64(np.bitwise_xor(self._hash_array[:count], target))
+        max_distance = int((1.0 - threshold) * 64 + 1e-9)
+        
+        candidates = np.flatnonzero(distance <= max_distance)
+        # Most similar first; stable so ties keep insertion order
+        candidates = candidates[np.argsort(distance[candidates], kind="stable")]
+        
+        entries = self._manifest.entries
+        return [entries[self._slot_ids[i]] for i in candidates[:max_results]]
+    
+    def find_nearest(
+        self,
+        coordinates: Sequence[float],
+        max_results: int = 10,
+    ) -> List[RSUEntry]:
+        """
+        Find RSUs stored nearest to a point in the 8D manifold.
+        
+        Distance is L1 over int8-quantized coordinates.
+        
+        Args:
+            coordinates: 8D point with components in [0, 1]
+            max_results: Maximum results to return
+        
+        Returns:
+            List of RSU entries, nearest first
+        """
+        count = len(self._slot_ids)
+        if count == 0:
+            return []
+        
+        query = _quantize_coordinates(coordinates).astype(np.int16)
+        distance = np.abs(self._coord_array[:count].astype(np.int16) - query).sum(axis=1)
+        nearest = np.argsort(distance, kind="stable")[:max_results]
         
-        return matches[:max_results]
+        entries = self._manifest.entries
+        return [entries[self._slot_ids[i]] for i in nearest]
     
     def get_conversation_chain(self, conversation_id: str) -> List[RSUEntry]:
         """
@@ -233,9 +342,9 @@ class RSUStorage:
         Returns:
             List of RSU entries in chronological order
         """
-        entries = self._manifest.find_by_conversation(conversation_id)
-        entries.sort(key=lambda e: e.created_at)
-        return entries
+        # The manifest's conversation index is appended to as RSUs are
+        # stored, so it is already chronological
+        return self._manifest.find_by_conversation(conversation_id)
     
     def archive(self, rsu_id: str) -> bool:
         """Archive an RSU (keeps data but marks inactive)."""
@@ -255,8 +364,9 @@ class RSUStorage:
         for chunk_id in entry.chunk_ids:
             self._delete_chunk(chunk_id, entry.vault_coordinates)
         
-        # Remove from manifest
-        del self._manifest.entries[rsu_id]
+        # Remove from manifest and the packed search columns
+        self._manifest.remove_entry(rsu_id)
+        self._unindex_entry(rsu_id)
         
         return True
     
@@ -273,6 +383,44 @@ class RSUStorage:
             },
         }
     
+    def _index_entries(self, entries: List[RSUEntry]) -> None:
+        """Append entries to the packed search columns."""
+        start = len(self._slot_ids)
+        end = start + len(entries)
+        if end > len(self._hash_array):
+            capacity = len(self._hash_array)
+            while capacity < end:
+                capacity *= 2
+            hashes = np.zeros(capacity, dtype=np.uint64)
+            hashes[:start] = self._hash_array[:start]
+            coords = np.zeros((capacity, _COORD_DIMS), dtype=np.int8)
+            coords[:start] = self._coord_array[:start]
+            self._hash_array = hashes
+            self._coord_array = coords
+        
+        self._hash_array[start:end] = np.fromiter(
+            (e.semantic_hash & _HASH_MASK for e in entries),
+            dtype=np.uint64,
+            count=len(entries),
+        )
+        for pos, entry in enumerate(entries, start):
+            self._coord_array[pos] = _quantize_coordinates(entry.vault_coordinates)
+            self._slot_ids.append(entry.rsu_id)
+            self._slot_pos[entry.rsu_id] = pos
+    
+    def _unindex_entry(self, rsu_id: str) -> None:
+        """Remove an RSU from the packed search columns (swap with last slot)."""
+        pos = self._slot_pos.pop(rsu_id, None)
+        if pos is None:
+            return
+        last = len(self._slot_ids) - 1
+        last_id = self._slot_ids.pop()
+        if pos != last:
+            self._hash_array[pos] = self._hash_array[last]
+            self._coord_array[pos] = self._coord_array[last]
+            self._slot_ids[pos] = last_id
+            self._slot_pos[last_id] = pos
+    
     def _compute_coordinates(
         self,
         semantic_hash: int,
@@ -303,26 +451,34 @@ class RSUStorage:
         
         return f"rsu_{timestamp}_{hash_prefix}_{unique}"
     
-    def _store_chunks(
+    def _chunk(
         self,
         data: bytes,
         coordinates: Tuple[float, ...],
+        pending: List[Tuple[str, bytes, Tuple[float, ...]]],
         prefix: str = "",
     ) -> List[str]:
-        """Store data in chunks."""
+        """Split data into chunks, queueing them on ``pending`` for writing."""
         chunk_ids = []
         chunk_size = self.config.chunk_size_bytes
         
         for i in range(0, len(data), chunk_size):
             chunk = data[i:i + chunk_size]
             chunk_id = f"{prefix}chunk_{i // chunk_size}_{uuid.uuid4().hex[:8]}"
-            
-            # Store via vault
-            self._vault.store_chunk(chunk_id, chunk, coordinates)
+            pending.append((chunk_id, chunk, coordinates))
             chunk_ids.append(chunk_id)
         
         return chunk_ids
     
+    def _write_chunks(self, chunks: List[Tuple[str, bytes, Tuple[float, ...]]]) -> None:
+        """Store chunks via vault, in bulk when the vault supports it."""
+        store_chunks = getattr(self._vault, "store_chunks", None)
+        if store_chunks is not None:
+            store_chunks(chunks)
+            return
+        for chunk_id, chunk, coordinates in chunks:
+            self._vault.store_chunk(chunk_id, chunk, coordinates)
+    
     def _retrieve_chunk(
         self,
         chunk_id: str,
@@ -339,12 +495,6 @@ class RSUStorage:
         """Delete a single chunk."""
         return self._vault.delete_chunk(chunk_id, coordinates)
     
-    def _compute_similarity(self, hash1: int, hash2: int) -> float:
-        """Compute similarity between two semantic hashes."""
-        xor = hash1 ^ hash2
-        distance = bin(xor).count('1')
-        return 1.0 - (distance / 64.0)  # Assuming 64-bit hashes
-    
     def _infer_kv_layers(self, kv_data: bytes) -> int:
         """Infer number of KV cache layers from data size."""
         # Rough estimate based on typical layer sizes
@@ -44,8 +44,11 @@ import sys
 import hmac
 import secrets
 import hashlib
-from typing import Optional, Tuple
+import ctypes
+import threading
+from typing import Dict, Optional, Tuple, Union
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
 import time
 
 
@@ -140,7 +143,8 @@ class MemoryBoundedBuffer:
     def __init__(self, max_size: Optional[int] = None):
         self.max_size = max_size or self.DEFAULT_MAX_SIZE
         self.current_size = 0
-        self._chunks = []
+        # Live chunks keyed by identity: O(1) allocate and free in any order
+        self._chunks: Dict[int, Union[bytearray, memoryview]] = {}
     
     def can_allocate(self, size: int) -> bool:
         """Check if we can allocate more memory."""
@@ -160,14 +164,36 @@ class MemoryBoundedBuffer:
             )
         
         chunk = bytearray(size)
-        self._chunks.append(chunk)
+        self._chunks[id(chunk)] = chunk
         self.current_size += size
         return chunk
     
-    def free_chunk(self, chunk: bytearray):
+    def allocate_uninit(self, size: int) -> memoryview:
+        """
+        Allocate a writable chunk without eagerly zero-filling it.
+        
+        ``bytearray(size)`` memsets every byte up front. A ctypes array is
+        calloc-backed, so large chunks come from lazily zeroed OS pages and
+        cost no write bandwidth until touched. Use this when the caller
+        fully overwrites the chunk; release it with ``free_chunk``.
+        
+        Raises:
+            MemoryError: If allocation would exceed limits
+        """
+        if not self.can_allocate(size):
+            raise MemoryError(
+                f"Cannot allocate {size} bytes. "
+                f"Current: {self.current_size}, Max: {self.max_size}"
+            )
+        
+        chunk = memoryview((ctypes.c_ubyte * size)()).cast('B')
+        self._chunks[id(chunk)] = chunk
+        self.current_size += size
+        return chunk
+    
+    def free_chunk(self, chunk: Union[bytearray, memoryview]):
         """Free a chunk and update tracking."""
-        if chunk in self._chunks:
-            self._chunks.remove(chunk)
+        if self._chunks.pop(id(chunk), None) is not None:
             self.current_size -= len(chunk)
     
     def clear(self):
@@ -191,6 +217,8 @@ class StreamingProcessor:
     - Memory bounds enforcement
     """
     
+    PROGRESS_SHIFT = 22  # Sample progress once per 4MB (1 << 22 bytes)
+    
     def __init__(self, chunk_size: int = 1024 * 1024):
         self.chunk_size = chunk_size
         self.bytes_processed = 0
@@ -208,6 +236,10 @@ class StreamingProcessor:
         """
         self.bytes_processed = 0
         
+        # Loop invariant: one multiply per progress sample instead of a divide
+        inv_total = 100.0 / total_size if total_size else 0.0
+        shift = self.PROGRESS_SHIFT
+        
         while True:
             chunk = input_stream.read(self.chunk_size)
             if not chunk:
@@ -217,11 +249,13 @@ class StreamingProcessor:
             processed = process_func(chunk)
             output_stream.write(processed)
             
+            previous = self.bytes_processed
             self.bytes_processed += len(chunk)
             
-            # Optional progress callback could go here
-            if total_size:
-                progress = (self.bytes_processed / total_size) * 100.0
+            # Optional progress callback could go here; only sampled when
+            # a 4MB boundary is crossed (high bits changed), not per chunk
+            if inv_total and (previous ^ self.bytes_processed) >> shift:
+                progress = self.bytes_processed * inv_total
                 # Progress tracking hook
     
     def get_progress(self) -> int:
@@ -239,53 +273,47 @@ class RWLock:
     
     Allows multiple concurrent readers OR single writer.
     More efficient than standard Lock for read-heavy workloads.
+    
+    All state lives behind a single condition variable: ``_state`` is the
+    number of active readers, or -1 while a writer holds the lock. Waiting
+    writers block new readers so writers cannot be starved.
     """
     
     def __init__(self):
-        import threading
-        self._readers = 0
-        self._writers = 0
-        self._read_ready = threading.Condition(threading.RLock())
-        self._write_ready = threading.Condition(threading.RLock())
+        self._state = 0
+        self._writers_waiting = 0
+        self._cond = threading.Condition(threading.Lock())
     
     def acquire_read(self):
         """Acquire read lock (multiple readers allowed)."""
-        self._read_ready.acquire()
-        try:
-            while self._writers > 0:
-                self._read_ready.wait()
-            self._readers += 1
-        finally:
-            self._read_ready.release()
+        with self._cond:
+            while self._state < 0 or self._writers_waiting:
+                self._cond.wait()
+            self._state += 1
     
     def release_read(self):
         """Release read lock."""
-        self._read_ready.acquire()
-        try:
-            self._readers -= 1
-            if self._readers == 0:
-                self._read_ready.notify_all()
-        finally:
-            self._read_ready.release()
+        with self._cond:
+            self._state -= 1
+            if self._state == 0:
+                self._cond.notify_all()
     
     def acquire_write(self):
         """Acquire write lock (exclusive access)."""
-        self._write_ready.acquire()
-        self._writers += 1
-        self._write_ready.release()
-        
-        self._read_ready.acquire()
-        while self._readers > 0:
-            self._read_ready.wait()
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._state != 0:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._state = -1
     
     def release_write(self):
         """Release write lock."""
-        self._writers -= 1
-        self._read_ready.notify_all()
-        self._read_ready.release()
-        self._write_ready.acquire()
-        self._write_ready.notify_all()
-        self._write_ready.release()
+        with self._cond:
+            self._state = 0
+            self._cond.notify_all()
 
 
 def synchronized_method(lock_attr='_lock'):
@@ -413,75 +441,88 @@ class ManagedResource:
 # TESTING & VERIFICATION
 # ============================================================================
 
-def verify_hardening():
-    """
-    Verify all hardening measures are working correctly.
-    Returns True if all checks pass.
-    """
-    results = {}
+def _check_constant_time() -> bool:
+    """Constant-time comparison accepts equal and rejects unequal input."""
+    a = b"test_data_12345678"
+    b = b"test_data_12345678"
+    c = b"different_data123"
     
-    # Test constant-time comparison
-    try:
-        a = b"test_data_12345678"
-        b = b"test_data_12345678"
-        c = b"different_data123"
-        
-        assert constant_time_compare(a, b) == True
-        assert constant_time_compare(a, c) == False
-        results['constant_time'] = True
-    except Exception as e:
-        results['constant_time'] = False
-        print(f"Constant-time test failed: {e}")
+    return constant_time_compare(a, b) and not constant_time_compare(a, c)
+
+
+def _check_memory_bounds() -> bool:
+    """MemoryBoundedBuffer tracks usage and refuses to exceed its limit."""
+    buffer = MemoryBoundedBuffer(max_size=1024)
+    buffer.allocate_chunk(512)
+    if buffer.current_size != 512:
+        return False
     
-    # Test memory bounds
+    # Should fail
     try:
-        buffer = MemoryBoundedBuffer(max_size=1024)
-        chunk = buffer.allocate_chunk(512)
-        assert buffer.current_size == 512
-        
-        # Should fail
-        try:
-            buffer.allocate_chunk(1024)
-            results['memory_bounds'] = False
-        except MemoryError:
-            results['memory_bounds'] = True
-    except Exception as e:
-        results['memory_bounds'] = False
-        print(f"Memory bounds test failed: {e}")
+        buffer.allocate_chunk(1024)
+    except MemoryError:
+        return True
+    return False
+
+
+def _check_rwlock() -> bool:
+    """RWLock admits multiple readers, then a single writer."""
+    lock = RWLock()
     
-    # Test RWLock
-    try:
-        import threading
-        lock = RWLock()
-        
-        # Multiple readers
-        lock.acquire_read()
-        lock.acquire_read()
-        lock.release_read()
-        lock.release_read()
-        
-        # Single writer
-        lock.acquire_write()
-        lock.release_write()
-        
-        results['rwlock'] = True
-    except Exception as e:
-        results['rwlock'] = False
-        print(f"RWLock test failed: {e}")
+    # Multiple readers
+    lock.acquire_read()
+    lock.acquire_read()
+    lock.release_read()
+    lock.release_read()
+    
+    # Single writer
+    lock.acquire_write()
+    lock.release_write()
+    return True
+
+
+def _check_safe_math() -> bool:
+    """safe_add computes in range and raises on overflow."""
+    if safe_add(100, 200) != 300:
+        return False
     
-    # Test safe math
     try:
-        result = safe_add(100, 200)
-        assert result == 300
-        
-        try:
-            safe_add(2**64 - 1, 1)  # Should overflow
-            results['safe_math'] = False
-        except OverflowError:
-            results['safe_math'] = True
+        safe_add(2**64 - 1, 1)  # Should overflow
+    except OverflowError:
+        return True
+    return False
+
+
+_HARDENING_CHECKS = (
+    ('constant_time', _check_constant_time),
+    ('memory_bounds', _check_memory_bounds),
+    ('rwlock', _check_rwlock),
+    ('safe_math', _check_safe_math),
+)
+
+
+def _run_check(check) -> bool:
+    """Run a single hardening check, reporting exceptions as failures."""
+    name, func = check
+    try:
+        return bool(func())
     except Exception as e:
-        results['safe_math'] = False
-        print(f"Safe math test failed: {e}")
+        print(f"{name} test failed: {e}")
+        return False
+
+
+def verify_hardening():
+    """
+    Verify all hardening measures are working correctly.
+    Returns True if all checks pass.
+    
+    The checks are independent, so they run concurrently.
+    """
+    with ThreadPoolExecutor(max_workers=len(_HARDENING_CHECKS)) as executor:
+        results = dict(zip(
+            (name for name, _ in _HARDENING_CHECKS),
+            executor.map(_run_check, _HARDENING_CHECKS),
+        ))
     
     # Print summary
     print("\n" + "="*60)
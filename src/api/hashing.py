@@ -0,0 +1,42 @@
+"""
+Semantic Hashing for Ryot LLM
+=============================
+
+The RSU key shared by the inference engine, ΣLANG integration and RSU
+manager, so RSUs stored by one are found by the others.
+"""
+
+from typing import Any
+import hashlib
+
+import numpy as np
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+
+def compute_semantic_hash(tokens: Any, security_mode: bool = False) -> int:
+    """
+    Compute the 64-bit semantic hash of a token sequence.
+
+    Hashes the low byte of each of the first 128 tokens (a token list/tuple
+    or TokenSequence), or the UTF-8 text of anything else. Uses xxh3-64
+    when xxhash is installed; ``security_mode`` (or a missing xxhash) keeps
+    the first 8 bytes of SHA-256, which crafted prompts cannot collide.
+    Every component storing or looking up RSUs must use the same mode.
+    """
+    sequence = getattr(tokens, 'tokens', tokens)
+    if isinstance(sequence, (list, tuple)):
+        # uint8 cast wraps mod 256
+        token_bytes = np.asarray(sequence[:128], dtype=np.int64).astype(np.uint8).tobytes()
+    else:
+        token_bytes = str(sequence).encode()
+
+    if HAS_XXHASH and not security_mode:
+        return xxhash.xxh3_64_intdigest(token_bytes)
+
+    hash_bytes = hashlib.sha256(token_bytes).digest()
+    return int.from_bytes(hash_bytes[:8], 'little')
@@ -6,8 +6,20 @@ Core types for the Ryot LLM pipeline with ΣLANG and RSU support.
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, List, Tuple, Any, Dict
+from typing import Optional, List, Tuple, Any, Dict, Union
 from enum import Enum
+import pickle
+import struct
+import sys
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+# __slots__ storage for hot dataclasses where supported (Python 3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
 
 class StopReason(Enum):
@@ -35,6 +47,15 @@ class TokenSequence:
         return cls(tokens=tuple(tokens))
 
 
+# KVCacheState wire format: tag byte, then a little-endian header with the
+# out-of-band buffer count and the lengths of the pickle body and each buffer.
+# Metadata-only states may instead be a msgpack map behind _MSGPACK_TAG.
+_KV_FRAME_TAG = b"K"
+_MSGPACK_TAG = b"M"
+_KV_FRAME_COUNT = struct.Struct("<I")
+_KV_FRAME_LENGTH = struct.Struct("<Q")
+
+
 @dataclass
 class KVCacheState:
     """KV cache state for inference."""
@@ -43,16 +64,103 @@ class KVCacheState:
     value_states: Optional[Any] = None
     sequence_length: int = 0
     
-    def export(self) -> bytes:
-        """Export cache state to bytes."""
-        import pickle
-        return pickle.dumps(self)
+    def export(self, buffers: Optional[List[Any]] = None) -> Union[bytes, bytearray]:
+        """
+        Export cache state to a bytes-like object.
+        
+        Uses pickle protocol 5 so tensor/array payloads are handed out as
+        out-of-band buffers instead of being copied into the pickle stream.
+        If ``buffers`` is given, those buffers are appended to it and only
+        the pickle body is returned (pass the same list to ``import_from``).
+        Otherwise everything is framed into a single bytearray, returned
+        as is so the payload is copied only once.
+        """
+        if buffers is not None:
+            return pickle.dumps(self, protocol=5, buffer_callback=buffers.append)
+        
+        out_of_band: List[pickle.PickleBuffer] = []
+        body = pickle.dumps(self, protocol=5, buffer_callback=out_of_band.append)
+        views = [memoryview(body)] + [buf.raw() for buf in out_of_band]
+        
+        header_size = (
+            len(_KV_FRAME_TAG)
+            + _KV_FRAME_COUNT.size
+            + _KV_FRAME_LENGTH.size * len(views)
+        )
+        frame = bytearray(header_size + sum(v.nbytes for v in views))
+        frame[:len(_KV_FRAME_TAG)] = _KV_FRAME_TAG
+        offset = len(_KV_FRAME_TAG)
+        _KV_FRAME_COUNT.pack_into(frame, offset, len(out_of_band))
+        offset += _KV_FRAME_COUNT.size
+        for view in views:
+            _KV_FRAME_LENGTH.pack_into(frame, offset, view.nbytes)
+            offset += _KV_FRAME_LENGTH.size
+        
+        # Single copy of each buffer straight into the output frame
+        target = memoryview(frame)
+        for view in views:
+            target[offset:offset + view.nbytes] = view
+            offset += view.nbytes
+        
+        return frame
+    
+    def export_fast(self) -> Union[bytes, bytearray]:
+        """
+        Export cache state, using msgpack when there are no tensors.
+        
+        Metadata-only states skip pickle entirely; anything carrying
+        key/value states, a length msgpack cannot encode (outside the
+        64-bit range, or a numpy integer), or running without msgpack
+        uses ``export``.
+        """
+        if HAS_MSGPACK and self.key_states is None and self.value_states is None:
+            try:
+                return _MSGPACK_TAG + msgpack.packb({"seq": self.sequence_length})
+            except (OverflowError, TypeError, ValueError):
+                pass
+        return self.export()
     
     @classmethod
-    def import_from(cls, data: bytes) -> 'KVCacheState':
-        """Import cache state from bytes."""
-        import pickle
-        return pickle.loads(data)
+    def import_from(
+        cls,
+        data: Union[bytes, bytearray],
+        buffers: Optional[List[Any]] = None,
+    ) -> 'KVCacheState':
+        """
+        Import cache state from bytes.
+        
+        Accepts the output of ``export`` (framed, or body plus ``buffers``)
+        and ``export_fast``, as well as legacy plain-pickle exports. Framed
+        buffers are sliced out of ``data`` without copying, so arrays
+        restored from an immutable ``bytes`` frame are read-only.
+        """
+        if buffers is not None:
+            return pickle.loads(data, buffers=buffers)
+        
+        view = memoryview(data)
+        tag = view[:1]
+        if tag == _MSGPACK_TAG:
+            if not HAS_MSGPACK:
+                raise ImportError("msgpack is required to import this KV cache state")
+            meta = msgpack.unpackb(view[1:])
+            return cls(sequence_length=meta["seq"])
+        if tag != _KV_FRAME_TAG:
+            return pickle.loads(data)
+        
+        offset = len(_KV_FRAME_TAG)
+        (count,) = _KV_FRAME_COUNT.unpack_from(view, offset)
+        offset += _KV_FRAME_COUNT.size
+        lengths = []
+        for _ in range(count + 1):
+            lengths.append(_KV_FRAME_LENGTH.unpack_from(view, offset)[0])
+            offset += _KV_FRAME_LENGTH.size
+        
+        parts = []
+        for length in lengths:
+            parts.append(view[offset:offset + length])
+            offset += length
+        
+        return pickle.loads(parts[0], buffers=parts[1:])
 
 
 @dataclass
@@ -74,9 +182,44 @@ class SigmaEncodedContext:
     semantic_hash: int
     timestamp: int
     compression_ratio: float
-
-
-@dataclass
+    
+    def export(self) -> bytes:
+        """
+        Export context to bytes.
+        
+        With msgpack available, glyphs are packed as a native ``bin``
+        field rather than going through pickle. Values msgpack cannot
+        encode (e.g. a ``semantic_hash`` of 2**64 or more, or a numpy
+        integer) fall back to pickle so they round-trip unchanged.
+        """
+        if HAS_MSGPACK:
+            try:
+                return _MSGPACK_TAG + msgpack.packb(
+                    [self.glyphs, self.semantic_hash, self.timestamp, self.compression_ratio],
+                    use_bin_type=True,
+                )
+            except (OverflowError, TypeError, ValueError):
+                pass
+        return pickle.dumps(self, protocol=5)
+    
+    @classmethod
+    def import_from(cls, data: bytes) -> 'SigmaEncodedContext':
+        """Import context from bytes produced by ``export``."""
+        view = memoryview(data)
+        if view[:1] != _MSGPACK_TAG:
+            return pickle.loads(data)
+        if not HAS_MSGPACK:
+            raise ImportError("msgpack is required to import this context")
+        glyphs, semantic_hash, timestamp, ratio = msgpack.unpackb(view[1:], raw=False)
+        return cls(
+            glyphs=glyphs,
+            semantic_hash=semantic_hash,
+            timestamp=timestamp,
+            compression_ratio=ratio,
+        )
+
+
+@dataclass(**_SLOTS)
 class GenerationConfig:
     """Configuration for text generation with RSU support."""
     
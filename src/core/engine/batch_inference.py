@@ -5,16 +5,40 @@ Batch Inference Engine
 Dynamic batching with continuous batching support for improved throughput.
 """
 
-from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Callable, Any
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Dict, Callable, Any, Tuple
 from datetime import datetime
+from collections import deque
 from queue import Queue, Empty
+import sys
 import threading
 import time
 import uuid
 
+import numpy as np
 
-@dataclass
+
+# __slots__ storage for hot dataclasses where supported (Python 3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Lock stripes for pending results/events (power of two)
+_NUM_SHARDS = 16
+
+# Queued by stop() to wake a worker blocked on the request queue
+_SENTINEL = object()
+
+
+def prompt_token_count(prompt: str) -> int:
+    """
+    Number of prompt tokens the scheduler and engines agree on.
+    
+    Whitespace-delimited words (any whitespace), at least 1. Used both to
+    size chunked prefill and to decide when a prompt is fully prefilled.
+    """
+    return max(1, len(prompt.split()))
+
+
+@dataclass(**_SLOTS)
 class BatchRequest:
     """Single inference request."""
     
@@ -22,19 +46,21 @@ class BatchRequest:
     prompt: str = ""
     max_tokens: int = 256
     temperature: float = 0.7
+    estimated_tokens: int = 0  # Prompt + decode token estimate, set by submit()
     result: Optional[str] = None
     error: Optional[str] = None
-    submitted_at: datetime = field(default_factory=datetime.utcnow)
-    completed_at: Optional[datetime] = None
+    # time.monotonic() timestamps; only meaningful as differences
+    submitted_at: float = field(default_factory=time.monotonic)
+    completed_at: Optional[float] = None
     
     @property
     def latency_ms(self) -> Optional[float]:
-        if self.completed_at:
-            return (self.completed_at - self.submitted_at).total_seconds() * 1000
+        if self.completed_at is not None:
+            return (self.completed_at - self.submitted_at) * 1000.0
         return None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class BatchConfig:
     """Configuration for batch inference."""
     
@@ -43,9 +69,12 @@ class BatchConfig:
     max_batch_tokens: int = 16384
     prefill_chunk_size: int = 512
     enable_continuous_batching: bool = True
+    enable_length_bucketing: bool = False  # Shortest-first admission (both scheduling paths)
+    max_queue_delay_ms: float = 500.0  # Bucketing: age after which a request jumps the sort
+    tpot_slo_ms: float = 50.0  # Target time per decode iteration (chunked prefill)
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class BatchStats:
     """Statistics for batch inference."""
     
@@ -57,8 +86,145 @@ class BatchStats:
     throughput_tokens_per_sec: float = 0.0
 
 
+class ActiveBatch:
+    """
+    Structure-of-arrays state of the running continuous batch.
+    
+    Per-sequence counters live in parallel numpy arrays preallocated to
+    the batch capacity, so per-iteration bookkeeping (token counts, EOS,
+    eviction) is a handful of vectorized ops instead of a walk over
+    request objects. Slots ``[0, size)`` are live; eviction compacts them.
+    """
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.size = 0
+        self.tokens_generated = np.zeros(capacity, dtype=np.int64)
+        self.max_tokens = np.zeros(capacity, dtype=np.int64)
+        self.estimated_tokens = np.zeros(capacity, dtype=np.int64)
+        self.eos = np.zeros(capacity, dtype=bool)
+        self.requests: List[BatchRequest] = []
+        self.outputs: List[List[str]] = []
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def total_tokens(self) -> int:
+        """Estimated token footprint of everything in flight."""
+        return int(self.estimated_tokens[:self.size].sum())
+    
+    def admit(self, request: BatchRequest, estimated_tokens: int) -> None:
+        """Append a prefilled request to the next free slot."""
+        i = self.size
+        self.tokens_generated[i] = 0
+        self.max_tokens[i] = request.max_tokens
+        self.estimated_tokens[i] = estimated_tokens
+        self.eos[i] = False
+        self.requests.append(request)
+        self.outputs.append([])
+        self.size += 1
+    
+    def record_step(self, step: List[Optional[str]]) -> int:
+        """Apply one decode step (a token or None=EOS per slot); return tokens emitted."""
+        n = self.size
+        emitted = np.fromiter((token is not None for token in step), dtype=bool, count=n)
+        for i in np.flatnonzero(emitted):
+            self.outputs[i].append(step[i])
+        self.tokens_generated[:n] += emitted
+        self.eos[:n] |= ~emitted
+        return int(emitted.sum())
+    
+    def evict(self) -> List[Tuple[BatchRequest, List[str]]]:
+        """Remove finished sequences, returning their requests and outputs."""
+        n = self.size
+        live = (self.tokens_generated[:n] < self.max_tokens[:n]) & ~self.eos[:n]
+        if live.all():
+            return []
+        
+        keep = np.flatnonzero(live)
+        finished = [(self.requests[i], self.outputs[i]) for i in np.flatnonzero(~live)]
+        
+        k = len(keep)
+        for column in (self.tokens_generated, self.max_tokens,
+                       self.estimated_tokens, self.eos):
+            column[:k] = column[keep]
+        self.requests = [self.requests[i] for i in keep]
+        self.outputs = [self.outputs[i] for i in keep]
+        self.size = k
+        return finished
+
+
+class LatencyPredictor:
+    """
+    Linear model of one scheduling iteration's latency (seconds).
+    
+    ``t = a * prefill_tokens + b * decode_seqs + c``. Starts from
+    conservative defaults and is refit by least squares on observed
+    iteration times every ``REFIT_INTERVAL`` samples, so the coefficients
+    track the engine actually being driven.
+    """
+    
+    REFIT_INTERVAL = 16
+    MIN_PREFILL_COST = 1e-7  # Floor on ``a`` so budgets stay finite
+    
+    def __init__(self, a: float = 1e-4, b: float = 5e-4, c: float = 1e-3):
+        self.a = a
+        self.b = b
+        self.c = c
+        self._xtx = np.zeros((3, 3))
+        self._xty = np.zeros(3)
+        self._samples = 0
+    
+    def predict(self, prefill_tokens: int, decode_seqs: int) -> float:
+        """Predicted latency of an iteration."""
+        return self.a * prefill_tokens + self.b * decode_seqs + self.c
+    
+    def prefill_budget(self, decode_seqs: int, slo: float) -> int:
+        """Most prefill tokens that keep the predicted iteration under ``slo``."""
+        spare = slo - self.b * decode_seqs - self.c
+        if spare <= 0:
+            return 0
+        return int(spare / self.a)
+    
+    def observe(self, prefill_tokens: int, decode_seqs: int, elapsed: float) -> None:
+        """Record a measured iteration, periodically refitting the model."""
+        x = np.array([prefill_tokens, decode_seqs, 1.0])
+        self._xtx += np.outer(x, x)
+        self._xty += x * elapsed
+        self._samples += 1
+        
+        if self._samples % self.REFIT_INTERVAL == 0:
+            a, b, c = np.linalg.lstsq(self._xtx, self._xty, rcond=None)[0]
+            self.a = max(float(a), self.MIN_PREFILL_COST)
+            self.b = max(float(b), 0.0)
+            self.c = max(float(c), 0.0)
+
+
+@dataclass(**_SLOTS)
+class PrefillProgress:
+    """A request admitted to the batch whose prompt is still being prefilled."""
+    
+    request: BatchRequest
+    prompt_tokens: int
+    estimated_tokens: int
+    done: int = 0
+    
+    @property
+    def remaining(self) -> int:
+        return self.prompt_tokens - self.done
+
+
 class MockEngine:
-    """Mock inference engine for testing."""
+    """
+    Mock inference engine for testing.
+    
+    Besides one-shot ``generate``, exposes the ``prefill``/``decode_step``
+    primitives used for iteration-level continuous batching, and
+    ``prefill_chunk`` for chunked prefill.
+    """
+    
+    def __init__(self):
+        self._pending: Dict[str, List[str]] = {}
     
     def generate(self, prompt: str, max_tokens: int = 256) -> Any:
         """Mock generation."""
@@ -66,6 +232,30 @@ class MockEngine:
             generated_text = f"Response to: {prompt[:50]}..."
             tokens_generated = min(max_tokens, 50)
         return Result()
+    
+    def prefill(self, request: BatchRequest) -> None:
+        """Mock prefill: queue up the tokens this request will decode."""
+        text = f"Response to: {request.prompt[:50]}..."
+        self._pending[request.request_id] = text.split()[:min(request.max_tokens, 50)]
+    
+    def prefill_chunk(self, request: BatchRequest, start: int, end: int) -> None:
+        """Mock chunked prefill of prompt tokens ``[start, end)``."""
+        if end >= prompt_token_count(request.prompt):
+            self.prefill(request)
+    
+    def decode_step(self, requests: List[BatchRequest]) -> List[Optional[str]]:
+        """Mock decode: one token per sequence, None once it hits EOS."""
+        tokens: List[Optional[str]] = []
+        for req in requests:
+            remaining = self._pending.get(req.request_id)
+            if not remaining:
+                self._pending.pop(req.request_id, None)
+                tokens.append(None)
+                continue
+            tokens.append(remaining.pop(0))
+            if not remaining:
+                del self._pending[req.request_id]
+        return tokens
 
 
 class BatchInferenceEngine:
@@ -78,6 +268,20 @@ class BatchInferenceEngine:
     - Token-budget-aware batching
     - Continuous batching for overlapped decode
     - Statistics tracking
+    
+    With continuous batching enabled and an engine exposing
+    ``prefill(request)`` and ``decode_step(requests)``, scheduling is done
+    per decode iteration: new arrivals are prefilled into the running
+    batch between steps and finished sequences retire immediately, so
+    short requests never wait for the longest one. Other engines are
+    driven batch-at-a-time through ``generate``.
+    
+    Engines that also expose ``prefill_chunk(request, start, end)`` get
+    Sarathi-style chunked prefill: prompts are prefilled at most
+    ``prefill_chunk_size`` tokens per request per iteration, piggybacked
+    on the decode step, with the iteration's prefill tokens capped so a
+    ``LatencyPredictor`` keeps it under ``tpot_slo_ms``. A long prompt then
+    delays running decodes by one chunk rather than its full length.
     """
     
     def __init__(
@@ -89,10 +293,22 @@ class BatchInferenceEngine:
         self.config = config or BatchConfig()
         
         self._queue: Queue = Queue()
-        self._results: Dict[str, BatchRequest] = {}
+        # Completed results and waiter events, lock-striped by request id
+        self._result_shards: List[Dict[str, BatchRequest]] = [{} for _ in range(_NUM_SHARDS)]
+        self._event_shards: List[Dict[str, threading.Event]] = [{} for _ in range(_NUM_SHARDS)]
+        self._shard_locks = [threading.Lock() for _ in range(_NUM_SHARDS)]
         self._running = False
         self._worker_thread: Optional[threading.Thread] = None
-        self._lock = threading.Lock()
+        # Statistics: total_requests is written by submitters under
+        # _submit_lock; every other field is written only by the worker
+        self._submit_lock = threading.Lock()
+        
+        # Continuous batching state (owned by the worker thread)
+        self._active = ActiveBatch(self.config.max_batch_size)
+        self._deferred: Optional[BatchRequest] = None
+        self._waiting: List[BatchRequest] = []  # Drained for bucketed admission
+        self._prefilling: deque = deque()  # PrefillProgress, FIFO
+        self._predictor = LatencyPredictor()
         
         self._stats = BatchStats()
         self._start_time: Optional[datetime] = None
@@ -112,10 +328,20 @@ class BatchInferenceEngine:
         self._worker_thread.start()
     
     def stop(self) -> None:
-        """Stop the batch inference worker."""
+        """
+        Stop the batch inference worker.
+        
+        Requests still queued or in flight are completed with an error so
+        their waiters return instead of hanging. If the worker is still
+        busy after the join timeout, it cancels them itself on exit.
+        """
         self._running = False
+        self._queue.put(_SENTINEL)
         if self._worker_thread:
             self._worker_thread.join(timeout=1.0)
+            if self._worker_thread.is_alive():
+                return
+        self._cancel_pending()
     
     def submit(self, request: BatchRequest) -> str:
         """
@@ -127,10 +353,14 @@ class BatchInferenceEngine:
         Returns:
             Request ID for result retrieval
         """
-        request.submitted_at = datetime.utcnow()
+        request.submitted_at = time.monotonic()
+        request.estimated_tokens = self._estimate_tokens(request)
+        shard = self._shard(request.request_id)
+        with self._shard_locks[shard]:
+            self._event_shards[shard][request.request_id] = threading.Event()
         self._queue.put(request)
         
-        with self._lock:
+        with self._submit_lock:
             self._stats.total_requests += 1
         
         return request.request_id
@@ -164,44 +394,101 @@ class BatchInferenceEngine:
         Returns:
             Completed BatchRequest or None if timeout
         """
-        start = time.time()
-        while time.time() - start < timeout:
-            with self._lock:
-                if request_id in self._results:
-                    return self._results.pop(request_id)
-            time.sleep(0.01)
-        return None
+        shard = self._shard(request_id)
+        event = self._event_shards[shard].get(request_id)
+        if event is None or not event.wait(timeout):
+            return None
+        
+        with self._shard_locks[shard]:
+            self._event_shards[shard].pop(request_id, None)
+            return self._result_shards[shard].pop(request_id, None)
+    
+    @staticmethod
+    def _shard(request_id: str) -> int:
+        """Index of the result/event shard owning ``request_id``."""
+        return hash(request_id) & (_NUM_SHARDS - 1)
     
     def _worker(self) -> None:
         """Background worker for batch processing."""
-        while self._running:
-            batch = self._collect_batch()
-            if batch:
-                self._process_batch(batch)
-            else:
-                time.sleep(0.001)  # Prevent busy-waiting
+        try:
+            while self._running:
+                if self._supports_stepping():
+                    self._continuous_iteration()
+                    continue
+                
+                batch = self._collect_batch()
+                if batch:
+                    self._process_batch(batch)
+        finally:
+            self._cancel_pending()
+    
+    def _cancel_pending(self) -> None:
+        """
+        Fail every queued, deferred, prefilling or decoding request.
+        
+        Only called when no worker is running (from the exiting worker or
+        after it has been joined). Also drops leftover stop sentinels.
+        """
+        pending: List[BatchRequest] = []
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except Empty:
+                break
+            if request is not _SENTINEL:
+                pending.append(request)
+        
+        if self._deferred is not None:
+            pending.append(self._deferred)
+            self._deferred = None
+        pending.extend(self._waiting)
+        self._waiting.clear()
+        pending.extend(progress.request for progress in self._prefilling)
+        self._prefilling.clear()
+        pending.extend(self._active.requests)
+        self._active = ActiveBatch(self.config.max_batch_size)
+        
+        now = time.monotonic()
+        for request in pending:
+            request.error = "Batch engine stopped"
+            request.completed_at = now
+            self._complete(request)
+    
+    @staticmethod
+    def _estimate_tokens(request: BatchRequest) -> int:
+        """Estimated token footprint of a request (prompt + decode)."""
+        return prompt_token_count(request.prompt) + request.max_tokens
     
     def _collect_batch(self) -> List[BatchRequest]:
         """
         Collect requests into a batch.
         
-        Respects max_batch_size and max_wait_time.
+        Respects max_batch_size and max_wait_time. Blocks up to
+        max_wait_time for the first request and returns an empty batch if
+        none arrives (or on shutdown), so the worker needs no idle sleep.
         """
+        if self.config.enable_length_bucketing:
+            return self._collect_bucketed_batch()
+        
         batch: List[BatchRequest] = []
         total_tokens = 0
-        wait_deadline = time.time() + (self.config.max_wait_time_ms / 1000)
+        max_wait = self.config.max_wait_time_ms / 1000
+        # Integer monotonic deadline: immune to wall-clock jumps
+        wait_deadline_ns = time.monotonic_ns() + int(self.config.max_wait_time_ms * 1_000_000)
         
         while len(batch) < self.config.max_batch_size:
-            remaining_time = wait_deadline - time.time()
-            if remaining_time <= 0 and batch:
+            remaining_ns = wait_deadline_ns - time.monotonic_ns()
+            if remaining_ns <= 0 and batch:
                 break  # Wait time exceeded, process what we have
             
             try:
-                timeout = max(0.001, remaining_time) if batch else 0.05
+                timeout = max(0.001, remaining_ns / 1e9) if batch else max_wait
                 request = self._queue.get(timeout=timeout)
+                if request is _SENTINEL:
+                    break
                 
                 # Check token budget
-                estimated_tokens = len(request.prompt.split()) + request.max_tokens
+                estimated_tokens = request.estimated_tokens
                 if total_tokens + estimated_tokens > self.config.max_batch_tokens:
                     # Put back and process current batch
                     self._queue.put(request)
@@ -211,12 +498,79 @@ class BatchInferenceEngine:
                 total_tokens += estimated_tokens
                 
             except Empty:
-                if batch:
+                break
+        
+        return batch
+    
+    def _collect_bucketed_batch(self) -> List[BatchRequest]:
+        """
+        Collect a batch of similarly sized requests.
+        
+        Drains up to 4x max_batch_size requests (waiting at most
+        max_wait_time for a full batch), sorts them by estimated tokens and
+        batches the shortest run that fits the token budget, so short
+        prompts are not padded out to a long one. Requests waiting longer
+        than max_queue_delay_ms go first (oldest first) so a steady stream
+        of short prompts cannot starve a long one. The rest are requeued.
+        """
+        try:
+            first = self._queue.get(timeout=self.config.max_wait_time_ms / 1000)
+        except Empty:
+            return []
+        if first is _SENTINEL:
+            return []
+        pool = [first]
+        
+        pool_limit = self.config.max_batch_size * 4
+        wait_deadline_ns = time.monotonic_ns() + int(self.config.max_wait_time_ms * 1_000_000)
+        while len(pool) < pool_limit:
+            try:
+                request = self._queue.get(block=False)
+            except Empty:
+                remaining_ns = wait_deadline_ns - time.monotonic_ns()
+                if remaining_ns <= 0 or len(pool) >= self.config.max_batch_size:
                     break
-                continue
+                try:
+                    request = self._queue.get(timeout=remaining_ns / 1e9)
+                except Empty:
+                    break
+            if request is _SENTINEL:
+                break
+            pool.append(request)
+        
+        pool.sort(key=self._bucket_key())
+        
+        batch: List[BatchRequest] = []
+        total_tokens = 0
+        for request in pool:
+            if len(batch) >= self.config.max_batch_size:
+                break
+            estimated_tokens = request.estimated_tokens
+            if batch and total_tokens + estimated_tokens > self.config.max_batch_tokens:
+                break
+            batch.append(request)
+            total_tokens += estimated_tokens
+        
+        for request in pool[len(batch):]:
+            self._queue.put(request)
         
         return batch
     
+    def _bucket_key(self) -> Callable[[BatchRequest], Tuple[int, float]]:
+        """
+        Sort key for length bucketing: shortest estimated tokens first,
+        except requests older than max_queue_delay_ms, which go ahead of
+        everything else, oldest first.
+        """
+        overdue_before = time.monotonic() - self.config.max_queue_delay_ms / 1000
+        
+        def key(request: BatchRequest) -> Tuple[int, float]:
+            if request.submitted_at <= overdue_before:
+                return (0, request.submitted_at)
+            return (1, request.estimated_tokens)
+        
+        return key
+    
     def _process_batch(self, batch: List[BatchRequest]) -> None:
         """Process a batch of requests."""
         batch_start = time.time()
@@ -228,27 +582,31 @@ class BatchInferenceEngine:
         
         batch_time = time.time() - batch_start
         
-        # Update statistics
-        with self._lock:
-            self._stats.total_batches += 1
-            batch_size = len(batch)
-            
-            # Update running average
-            old_avg = self._stats.avg_batch_size
-            old_count = self._stats.total_batches - 1
-            self._stats.avg_batch_size = (
-                (old_avg * old_count + batch_size) / self._stats.total_batches
-            )
-            
-            # Calculate throughput
-            total_tokens = sum(
-                r.max_tokens for r in batch if r.result
-            )
-            self._stats.total_tokens_generated += total_tokens
-            
-            if batch_time > 0:
-                tokens_per_sec = total_tokens / batch_time
-                self._stats.throughput_tokens_per_sec = tokens_per_sec
+        total_tokens = sum(
+            r.max_tokens for r in batch if r.result
+        )
+        self._record_batch(len(batch), total_tokens, batch_time)
+    
+    def _record_batch(self, batch_size: int, total_tokens: int, batch_time: float) -> None:
+        """
+        Fold one processed batch (or decode iteration) into statistics.
+        
+        Worker thread only; the fields touched here have no other writer,
+        so no lock is taken.
+        """
+        stats = self._stats
+        stats.total_batches += 1
+        
+        # Update running average
+        old_avg = stats.avg_batch_size
+        old_count = stats.total_batches - 1
+        stats.avg_batch_size = (old_avg * old_count + batch_size) / stats.total_batches
+        
+        # Calculate throughput
+        stats.total_tokens_generated += total_tokens
+        
+        if batch_time > 0:
+            stats.throughput_tokens_per_sec = total_tokens / batch_time
     
     def _process_sequential(self, batch: List[BatchRequest]) -> None:
         """Process batch sequentially (simple mode)."""
@@ -259,35 +617,225 @@ class BatchInferenceEngine:
                     max_tokens=req.max_tokens,
                 )
                 req.result = result.generated_text
-                req.completed_at = datetime.utcnow()
+                req.completed_at = time.monotonic()
             except Exception as e:
                 req.error = str(e)
-                req.completed_at = datetime.utcnow()
+                req.completed_at = time.monotonic()
             
-            with self._lock:
-                self._results[req.request_id] = req
+            self._complete(req)
+    
+    def _complete(self, req: BatchRequest) -> None:
+        """Publish a finished request and wake its waiter."""
+        shard = self._shard(req.request_id)
+        with self._shard_locks[shard]:
+            self._result_shards[shard][req.request_id] = req
+            event = self._event_shards[shard].get(req.request_id)
+        if event is not None:
+            event.set()
     
     def _process_continuous(self, batch: List[BatchRequest]) -> None:
         """Process batch with continuous batching (overlapped decode)."""
-        # In a real implementation, this would overlap prefill and decode
-        # For now, use sequential as fallback
+        # Only reached for engines without prefill/decode_step primitives;
+        # stepping engines are scheduled per iteration by the worker
         self._process_sequential(batch)
     
+    def _supports_stepping(self) -> bool:
+        """Whether iteration-level continuous batching can be used."""
+        return (
+            self.config.enable_continuous_batching
+            and hasattr(self.engine, "prefill")
+            and hasattr(self.engine, "decode_step")
+        )
+    
+    def _continuous_iteration(self) -> None:
+        """Admit new arrivals, then run one decode step plus prefill chunks."""
+        self._admit()
+        if not self._active and not self._prefilling:
+            return
+        
+        iteration_start = time.perf_counter()
+        decode_seqs = len(self._active)
+        if decode_seqs:
+            self._decode_iteration()
+        prefill_tokens = self._prefill_iteration(decode_seqs) if self._prefilling else 0
+        self._predictor.observe(
+            prefill_tokens, decode_seqs, time.perf_counter() - iteration_start
+        )
+    
+    def _next_request(self, block: bool) -> Optional[BatchRequest]:
+        """Next request to admit, preferring one deferred for budget."""
+        if self._deferred is not None:
+            request, self._deferred = self._deferred, None
+            return request
+        if self.config.enable_length_bucketing:
+            return self._next_bucketed_request(block)
+        return self._dequeue(block)
+    
+    def _dequeue(self, block: bool) -> Optional[BatchRequest]:
+        """Take the next queued request (None on timeout or stop sentinel)."""
+        try:
+            if block:
+                request = self._queue.get(timeout=self.config.max_wait_time_ms / 1000)
+            else:
+                request = self._queue.get_nowait()
+        except Empty:
+            return None
+        return None if request is _SENTINEL else request
+    
+    def _next_bucketed_request(self, block: bool) -> Optional[BatchRequest]:
+        """
+        Shortest (or overdue) request among those waiting for admission.
+        
+        Tops the waiting pool up to 4x max_batch_size from the queue
+        without blocking (blocking only when the pool is empty), then
+        picks by ``_bucket_key``.
+        """
+        if not self._waiting:
+            first = self._dequeue(block)
+            if first is None:
+                return None
+            self._waiting.append(first)
+        
+        pool_limit = self.config.max_batch_size * 4
+        while len(self._waiting) < pool_limit:
+            try:
+                request = self._queue.get_nowait()
+            except Empty:
+                break
+            if request is _SENTINEL:
+                break
+            self._waiting.append(request)
+        
+        request = min(self._waiting, key=self._bucket_key())
+        self._waiting.remove(request)
+        return request
+    
+    def _admit(self) -> None:
+        """
+        Prefill queued requests into the running batch.
+        
+        Respects max_batch_size and the max_batch_tokens budget (prompt
+        plus decode tokens of everything in flight). Only blocks for work
+        when nothing is in flight, so running sequences are never stalled.
+        With ``enable_length_bucketing`` the shortest waiting request is
+        admitted first (see ``_next_bucketed_request``). With a chunking engine, requests are only queued for prefill here;
+        ``_prefill_iteration`` does the work.
+        """
+        chunked = hasattr(self.engine, "prefill_chunk")
+        while len(self._active) + len(self._prefilling) < self.config.max_batch_size:
+            in_flight = bool(self._active) or bool(self._prefilling)
+            request = self._next_request(block=not in_flight)
+            if request is None:
+                break
+            
+            estimated_tokens = request.estimated_tokens
+            if in_flight and self._in_flight_tokens() + estimated_tokens > self.config.max_batch_tokens:
+                # Over budget: hold it (keeping its place) for a later iteration
+                self._deferred = request
+                break
+            
+            if chunked:
+                # submit() sized the prompt with prompt_token_count()
+                prompt_tokens = estimated_tokens - request.max_tokens
+                self._prefilling.append(
+                    PrefillProgress(request, prompt_tokens, estimated_tokens)
+                )
+                continue
+            
+            try:
+                self.engine.prefill(request)
+            except Exception as e:
+                request.error = str(e)
+                request.completed_at = time.monotonic()
+                self._complete(request)
+                continue
+            
+            self._active.admit(request, estimated_tokens)
+    
+    def _in_flight_tokens(self) -> int:
+        """Estimated tokens of running plus still-prefilling requests."""
+        return self._active.total_tokens() + sum(
+            p.estimated_tokens for p in self._prefilling
+        )
+    
+    def _prefill_iteration(self, decode_seqs: int) -> int:
+        """
+        Prefill one chunk of each waiting prompt, within the latency budget.
+        
+        Requests are served FIFO; a request whose prompt is fully
+        prefilled joins the decode batch for the next iteration. At least
+        one chunk is run when nothing is decoding, so prefill never stalls.
+        Returns the number of prompt tokens prefilled.
+        """
+        chunk_size = self.config.prefill_chunk_size
+        budget = self._predictor.prefill_budget(decode_seqs, self.config.tpot_slo_ms / 1000.0)
+        spent = 0
+        
+        for progress in list(self._prefilling):
+            n = min(chunk_size, progress.remaining, budget - spent)
+            if n <= 0:
+                if spent or decode_seqs:
+                    break
+                n = min(chunk_size, progress.remaining)
+            
+            request = progress.request
+            try:
+                self.engine.prefill_chunk(request, progress.done, progress.done + n)
+            except Exception as e:
+                self._prefilling.remove(progress)
+                request.error = str(e)
+                request.completed_at = time.monotonic()
+                self._complete(request)
+                continue
+            
+            progress.done += n
+            spent += n
+            if progress.remaining == 0:
+                self._prefilling.remove(progress)
+                self._active.admit(request, progress.estimated_tokens)
+        
+        return spent
+    
+    def _decode_iteration(self) -> None:
+        """Generate one token per active sequence and retire finished ones."""
+        step_start = time.time()
+        batch_size = len(self._active)
+        
+        try:
+            step = self.engine.decode_step(list(self._active.requests))
+        except Exception as e:
+            for req in self._active.requests:
+                req.error = str(e)
+            step = [None] * batch_size
+        
+        generated = self._active.record_step(step)
+        for req, tokens in self._active.evict():
+            self._retire(req, tokens)
+        
+        self._record_batch(batch_size, generated, time.time() - step_start)
+    
+    def _retire(self, req: BatchRequest, tokens: List[str]) -> None:
+        """Finish a sequence and hand its request back to the caller."""
+        if req.error is None:
+            req.result = " ".join(tokens)
+        req.completed_at = time.monotonic()
+        self._complete(req)
+    
     def get_stats(self) -> BatchStats:
-        """Get current batch statistics."""
-        with self._lock:
-            return BatchStats(
-                total_requests=self._stats.total_requests,
-                total_batches=self._stats.total_batches,
-                total_tokens_generated=self._stats.total_tokens_generated,
-                avg_batch_size=self._stats.avg_batch_size,
-                avg_latency_ms=self._stats.avg_latency_ms,
-                throughput_tokens_per_sec=self._stats.throughput_tokens_per_sec,
-            )
+        """
+        Get current batch statistics.
+        
+        A copy taken without stopping the worker: each field is current,
+        though worker fields may be one batch apart from each other.
+        """
+        return replace(self._stats)
     
     def queue_size(self) -> int:
-        """Get current queue size."""
-        return self._queue.qsize()
+        """Get current queue size (requests only, not stop sentinels)."""
+        with self._queue.mutex:
+            queued = sum(1 for item in self._queue.queue if item is not _SENTINEL)
+        # Plus requests drained for bucketed admission but not yet admitted
+        return queued + len(self._waiting)
 
 
 # Convenience factory
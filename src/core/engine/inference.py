@@ -5,10 +5,42 @@ Ryot LLM Inference Engine with RSU Support
 Core inference engine with ΣLANG compression and RSU warm-start capabilities.
 """
 
-from typing import Optional
+from typing import Optional, Dict, List, Tuple, Sequence
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime
+import sys
+
+import numpy as np
+
+from ...api.hashing import compute_semantic_hash
+
+try:
+    import ahocorasick
+    HAS_AHOCORASICK = True
+except ImportError:
+    HAS_AHOCORASICK = False
+
+
+# __slots__ storage for hot dataclasses where supported (Python 3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# MinHash/LSH parameters for near-duplicate prompt lookup. 16 bands of 8
+# rows put the LSH candidate threshold near Jaccard 0.7, below the default
+# rsu_similarity_threshold, so likely matches are not missed.
+_SHINGLE_SIZE = 3
+_MINHASH_PERMUTATIONS = 128
+_LSH_BANDS = 16
+_MINHASH_PRIME = (1 << 31) - 1  # Keeps a * x + b within int64
+_MINHASH_CHUNK = 4096  # Shingles hashed per pass (bounds peak memory)
+_LSH_MAX_ENTRIES = 4096  # Default LSH index capacity (least recently used evicted)
+
+# Fixed seed: signatures must agree across engine instances
+_rng = np.random.default_rng(0x5EED)
+_MINHASH_A = _rng.integers(1, _MINHASH_PRIME, size=(_MINHASH_PERMUTATIONS, 1), dtype=np.int64)
+_MINHASH_B = _rng.integers(0, _MINHASH_PRIME, size=(_MINHASH_PERMUTATIONS, 1), dtype=np.int64)
+del _rng
 
 
 class StopReason(Enum):
@@ -19,7 +51,77 @@ class StopReason(Enum):
     ERROR = "error"
 
 
-@dataclass
+class StopSequenceMatcher:
+    """
+    Aho-Corasick automaton over a set of stop sequences.
+    
+    Finds the first stop sequence in a text in a single O(len(text)) pass
+    regardless of how many sequences there are. Uses the pyahocorasick C
+    extension when installed, otherwise a pure-Python automaton.
+    """
+    
+    def __init__(self, stop_sequences: Sequence[str]):
+        self.sequences = tuple(stop_sequences)
+        words = [s for s in self.sequences if s]
+        
+        if HAS_AHOCORASICK:
+            self._automaton = ahocorasick.Automaton()
+            for word in words:
+                self._automaton.add_word(word, len(word))
+            self._automaton.make_automaton()
+            return
+        
+        # goto transitions, failure links, and per state the longest
+        # sequence ending there (0 if none)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._match: List[int] = [0]
+        for word in words:
+            state = 0
+            for ch in word:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._match.append(0)
+                state = nxt
+            self._match[state] = max(self._match[state], len(word))
+        
+        # Breadth-first so failure targets are complete before use
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._match[nxt] = max(self._match[nxt], self._match[self._fail[nxt]])
+                queue.append(nxt)
+    
+    def find(self, text: str) -> int:
+        """Start index of the first stop sequence to complete in text, or -1."""
+        if HAS_AHOCORASICK:
+            if self._automaton.kind == ahocorasick.EMPTY:
+                return -1
+            for end, length in self._automaton.iter(text):
+                return end - length + 1
+            return -1
+        
+        goto, fail, match = self._goto, self._fail, self._match
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if match[state]:
+                return i - match[state] + 1
+        return -1
+
+
+@dataclass(**_SLOTS)
 class GenerationConfig:
     """Configuration for text generation."""
     
@@ -39,6 +141,20 @@ class GenerationConfig:
     store_rsu: bool = True
     conversation_id: Optional[str] = None
     rsu_similarity_threshold: float = 0.85
+    
+    # Compiled lazily from stop_sequences by stop_matcher()
+    _stop_matcher: Optional[StopSequenceMatcher] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def stop_matcher(self) -> Optional[StopSequenceMatcher]:
+        """Automaton for ``stop_sequences`` (None if there are none), built once."""
+        if not self.stop_sequences:
+            return None
+        matcher = self._stop_matcher
+        if matcher is None or matcher.sequences != tuple(self.stop_sequences):
+            matcher = self._stop_matcher = StopSequenceMatcher(self.stop_sequences)
+        return matcher
 
 
 @dataclass
@@ -71,6 +187,12 @@ class InferenceEngine:
     - RSU warm-start
     - Conversation continuity
     - KV cache management
+    
+    RSU warm-start lookups go through a MinHash/LSH index over token
+    3-grams, so a prompt that differs slightly from a stored one (Jaccard
+    similarity of at least ``rsu_similarity_threshold``) still reuses its
+    RSU instead of requiring an exact semantic-hash match. A cached prefix
+    is only skipped after checking the prompt actually starts with it.
     """
     
     def __init__(
@@ -84,9 +206,21 @@ class InferenceEngine:
         self._tokenizer = tokenizer
         self._sigma = sigma_integration
         self._config = config or {}
+        # SHA-256 semantic hashes instead of xxh3; defaults to the ΣLANG
+        # integration's mode so both key RSUs the same way
+        sigma_config = getattr(sigma_integration, 'config', None)
+        self._security_mode = bool(self._config.get(
+            "security_mode", getattr(sigma_config, 'security_mode', False)
+        ))
         self._ready = False
         self._cache = None
         
+        # LSH index: (band, band rows) -> semantic hashes of stored RSUs.
+        # Signatures are kept in LRU order and capped at lsh_max_entries.
+        self._lsh_buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._lsh_signatures: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._lsh_max_entries = int(self._config.get("lsh_max_entries", _LSH_MAX_ENTRIES))
+        
         if model is not None and tokenizer is not None:
             self._ready = True
     
@@ -126,16 +260,37 @@ class InferenceEngine:
         cache_position = 0
         
         # Try RSU warm-start if enabled
+        signature = None
         if config.use_sigma_compression and self._sigma:
             # Compute semantic hash
             semantic_hash = self._compute_semantic_hash(input_tokens)
+            signature = self._compute_minhash(input_tokens)
             
-            # Try warm-start from existing RSU
+            # Try warm-start from existing RSU, preferring a near-duplicate
             if config.use_rsu_warmstart:
-                cached_tokens, cache_position = self._sigma.warm_start_inference(
-                    semantic_hash,
-                    self._cache,
+                cache_position = 0
+                similar_hash = self._find_similar_rsu(
+                    signature, config.rsu_similarity_threshold
                 )
+                if similar_hash is not None and similar_hash != semantic_hash:
+                    cached_tokens, cache_position = self._sigma.warm_start_inference(
+                        similar_hash,
+                        self._cache,
+                    )
+                    # MinHash similarity ignores token order: only reuse the
+                    # near-duplicate if this prompt really starts with its prefix
+                    if not self._starts_with_cached(input_tokens, cached_tokens, cache_position):
+                        cache_position = 0
+                
+                if cache_position == 0:
+                    cached_tokens, cache_position = self._sigma.warm_start_inference(
+                        semantic_hash,
+                        self._cache,
+                    )
+                    if cached_tokens is not None and not self._starts_with_cached(
+                        input_tokens, cached_tokens, cache_position
+                    ):
+                        cache_position = 0
                 
                 if cache_position > 0:
                     # Skip cached portion
@@ -145,6 +300,15 @@ class InferenceEngine:
         
         # Generate (mock)
         generated_text = self._mock_generate(prompt, config.max_tokens)
+        stop_reason = StopReason.MAX_TOKENS
+        
+        stop_matcher = config.stop_matcher()
+        if stop_matcher is not None:
+            stop_at = stop_matcher.find(generated_text)
+            if stop_at >= 0:
+                generated_text = generated_text[:stop_at]
+                stop_reason = StopReason.STOP_SEQUENCE
+        
         completion_tokens = len(generated_text.split())
         
         # Store RSU after generation if enabled
@@ -159,6 +323,11 @@ class InferenceEngine:
                 
                 compression_ratio = comp_result.compression_ratio
                 rsu_reference = comp_result.rsu_reference
+                if rsu_reference is not None:
+                    # Index the tokens actually stored (after any warm-start skip)
+                    if cache_position > 0:
+                        signature = self._compute_minhash(input_tokens)
+                    self._index_rsu(comp_result.semantic_hash, signature)
             except Exception as e:
                 print(f"Warning: RSU storage failed: {e}")
         
@@ -168,7 +337,7 @@ class InferenceEngine:
             generated_text=generated_text,
             completion_tokens=completion_tokens,
             prompt_tokens=len(input_tokens),
-            stop_reason=StopReason.MAX_TOKENS,
+            stop_reason=stop_reason,
             compression_ratio=compression_ratio,
             rsu_reference=rsu_reference,
             cache_warm_start_position=cache_position,
@@ -176,18 +345,126 @@ class InferenceEngine:
             preprocessing_time=preprocessing_time,
         )
     
+    @staticmethod
+    def _starts_with_cached(tokens, cached_tokens, position: int) -> bool:
+        """Whether ``tokens`` begins with the first ``position`` cached tokens."""
+        if cached_tokens is None or position <= 0:
+            return False
+        cached_tokens = getattr(cached_tokens, 'tokens', cached_tokens)  # TokenSequence
+        if len(cached_tokens) < position or len(tokens) < position:
+            return False
+        return list(tokens[:position]) == list(cached_tokens[:position])
+    
     def _mock_generate(self, prompt: str, max_tokens: int) -> str:
         """Mock generation for testing."""
         return " ".join(["generated"] * min(max_tokens, 50))
     
     def _compute_semantic_hash(self, tokens) -> int:
-        """Compute semantic hash for tokens."""
-        import hashlib
+        """
+        Compute semantic hash for tokens.
         
-        if isinstance(tokens, (list, tuple)):
-            token_bytes = bytes(t % 256 for t in tokens[:128])
-        else:
-            token_bytes = str(tokens).encode()
+        Accepts a token list/tuple or a TokenSequence; for the latter the
+        hash is cached on ``semantic_hash`` so it is only computed once.
+        
+        Uses ``compute_semantic_hash``: the same key SigmaIntegration and
+        the RSU manager store RSUs under, so warm-start lookups hit.
+        """
+        cached = getattr(tokens, 'semantic_hash', None)
+        if cached is not None:
+            return cached
+        
+        semantic_hash = compute_semantic_hash(tokens, self._security_mode)
+        
+        if hasattr(tokens, 'tokens'):
+            tokens.semantic_hash = semantic_hash
+        return semantic_hash
+    
+    def _compute_minhash(self, tokens) -> Optional[np.ndarray]:
+        """
+        MinHash signature of the token 3-gram set.
+        
+        Each shingle is folded to an integer mod p and passed through 128
+        universal hashes ``(a * x + b) % p``; the signature keeps the
+        minimum per hash, so the fraction of equal entries between two
+        signatures estimates the Jaccard similarity of their shingle sets.
+        """
+        sequence = getattr(tokens, 'tokens', tokens)
+        if not isinstance(sequence, (list, tuple)) or not sequence:
+            return None
+        
+        ids = np.asarray(sequence, dtype=np.int64) % _MINHASH_PRIME
+        if len(ids) < _SHINGLE_SIZE:
+            ids = np.pad(ids, (0, _SHINGLE_SIZE - len(ids)))
+        
+        # Polynomial fold of each sliding 3-gram, reduced mod p at each step
+        window = np.lib.stride_tricks.sliding_window_view(ids, _SHINGLE_SIZE)
+        shingles = np.zeros(len(window), dtype=np.int64)
+        for column in window.T:
+            shingles = (shingles * 1_000_003 + column) % _MINHASH_PRIME
+        shingles = np.unique(shingles)
+        
+        signature = np.full(_MINHASH_PERMUTATIONS, _MINHASH_PRIME, dtype=np.int64)
+        for start in range(0, len(shingles), _MINHASH_CHUNK):
+            chunk = shingles[start:start + _MINHASH_CHUNK]
+            hashed = (_MINHASH_A * chunk + _MINHASH_B) % _MINHASH_PRIME
+            np.minimum(signature, hashed.min(axis=1), out=signature)
+        return signature
+    
+    @staticmethod
+    def _lsh_keys(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        """Bucket keys of a signature, one per LSH band."""
+        bands = signature.reshape(_LSH_BANDS, -1)
+        return [(i, band.tobytes()) for i, band in enumerate(bands)]
+    
+    def _index_rsu(self, semantic_hash: int, signature: Optional[np.ndarray]) -> None:
+        """Register a stored RSU's signature in the LSH index."""
+        if signature is None:
+            return
+        if semantic_hash in self._lsh_signatures:
+            self._lsh_signatures.move_to_end(semantic_hash)
+            return
+        self._lsh_signatures[semantic_hash] = signature
+        for key in self._lsh_keys(signature):
+            self._lsh_buckets.setdefault(key, []).append(semantic_hash)
+        
+        while len(self._lsh_signatures) > self._lsh_max_entries:
+            self._evict_lsh_entry()
+    
+    def _evict_lsh_entry(self) -> None:
+        """Drop the least recently used RSU from the LSH index."""
+        semantic_hash, signature = self._lsh_signatures.popitem(last=False)
+        for key in self._lsh_keys(signature):
+            bucket = self._lsh_buckets.get(key)
+            if bucket is None:
+                continue
+            bucket.remove(semantic_hash)
+            if not bucket:
+                del self._lsh_buckets[key]
+    
+    def _find_similar_rsu(
+        self,
+        signature: Optional[np.ndarray],
+        threshold: float,
+    ) -> Optional[int]:
+        """
+        Semantic hash of the most similar indexed RSU, if any.
+        
+        Only RSUs sharing at least one LSH band are compared; the best
+        estimated Jaccard similarity must reach ``threshold``.
+        """
+        if signature is None or not self._lsh_buckets:
+            return None
+        
+        candidates = set()
+        for key in self._lsh_keys(signature):
+            candidates.update(self._lsh_buckets.get(key, ()))
+        
+        best_hash, best_similarity = None, threshold
+        for candidate in candidates:
+            similarity = float(np.mean(self._lsh_signatures[candidate] == signature))
+            if similarity >= best_similarity:
+                best_hash, best_similarity = candidate, similarity
         
-        hash_bytes = hashlib.sha256(token_bytes).digest()
-        return int.from_bytes(hash_bytes[:8], 'little')
+        if best_hash is not None:
+            self._lsh_signatures.move_to_end(best_hash)
+        return best_hash
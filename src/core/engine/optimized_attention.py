@@ -7,7 +7,14 @@ O(N) memory complexity attention implementation with KV caching.
 
 import math
 from dataclasses import dataclass
-from typing import Optional, Tuple, List, Any
+from typing import Optional, Tuple, List, Any, Dict
+
+try:
+    import torch
+    import torch.nn.functional as F
+    HAS_TORCH = True
+except ImportError:
+    HAS_TORCH = False
 
 
 @dataclass
@@ -20,6 +27,15 @@ class AttentionConfig:
     chunk_size: int = 1024
     dropout: float = 0.0
     causal: bool = True
+    max_length: int = 4096  # Preallocated KV cache length (grows if exceeded)
+    paged_kv_cache: bool = False  # Share a block pool across sequences
+    block_size: int = 16  # Tokens per KV cache block (paged mode)
+    num_blocks: int = 256  # Initial block pool size (paged mode, grows if exhausted)
+    kv_quant: Optional[str] = None  # "int8" or "fp8_e4m3" cached K/V (contiguous mode)
+
+
+# Largest representable magnitude per KV quantization format
+_KV_QUANT_RANGES = {"int8": 127.0, "fp8_e4m3": 448.0}
 
 
 class MockTensor:
@@ -32,27 +48,127 @@ class MockTensor:
     def __matmul__(self, other):
         return MockTensor(shape=(self.shape[0], self.shape[1], other.shape[-1]))
     
+    def reshape(self, *shape: int) -> 'MockTensor':
+        """Reshape; one dimension may be -1 (inferred)."""
+        total = math.prod(self.shape)
+        known = math.prod(d for d in shape if d != -1)
+        return MockTensor(shape=tuple(total // known if d == -1 else d for d in shape))
+    
     def transpose(self, dim1: int, dim2: int):
         new_shape = list(self.shape)
         new_shape[dim1], new_shape[dim2] = new_shape[dim2], new_shape[dim1]
         return MockTensor(shape=tuple(new_shape))
     
+    def _broadcast(self, other) -> 'MockTensor':
+        """Result of an elementwise op with a tensor or scalar."""
+        if not isinstance(other, MockTensor):
+            return MockTensor(shape=self.shape)
+        a, b = self.shape, other.shape
+        rank = max(len(a), len(b))
+        a = (1,) * (rank - len(a)) + tuple(a)
+        b = (1,) * (rank - len(b)) + tuple(b)
+        return MockTensor(shape=tuple(max(x, y) for x, y in zip(a, b)))
+    
     def __add__(self, other):
+        return self._broadcast(other)
+    
+    def abs(self) -> 'MockTensor':
         return MockTensor(shape=self.shape)
     
-    def __getitem__(self, key):
+    def round(self) -> 'MockTensor':
         return MockTensor(shape=self.shape)
+    
+    def clamp(self, min: float = None, max: float = None) -> 'MockTensor':
+        return MockTensor(shape=self.shape)
+    
+    def to(self, dtype: Any) -> 'MockTensor':
+        """Cast (no dtype in the mock)."""
+        return MockTensor(shape=self.shape)
+    
+    def __sub__(self, other):
+        return self._broadcast(other)
+    
+    def __mul__(self, other):
+        return self._broadcast(other)
+    
+    def __truediv__(self, other):
+        return self._broadcast(other)
+    
+    def maximum(self, other: 'MockTensor') -> 'MockTensor':
+        return self._broadcast(other)
+    
+    def exp(self) -> 'MockTensor':
+        return MockTensor(shape=self.shape)
+    
+    def amax(self, dim: int = -1, keepdim: bool = False) -> 'MockTensor':
+        return self._reduce(dim, keepdim)
+    
+    def sum(self, dim: int = -1, keepdim: bool = False) -> 'MockTensor':
+        return self._reduce(dim, keepdim)
+    
+    def _reduce(self, dim: int, keepdim: bool) -> 'MockTensor':
+        new_shape = list(self.shape)
+        if keepdim:
+            new_shape[dim] = 1
+        else:
+            del new_shape[dim]
+        return MockTensor(shape=tuple(new_shape))
+    
+    def __getitem__(self, key):
+        if not isinstance(key, tuple):
+            key = (key,)
+        new_shape = []
+        for dim, size in enumerate(self.shape):
+            index = key[dim] if dim < len(key) else slice(None)
+            if isinstance(index, slice):
+                new_shape.append(len(range(*index.indices(size))))
+        return MockTensor(shape=tuple(new_shape))
+    
+    def __setitem__(self, key, value):
+        """In-place write (no data to copy in the mock)."""
+    
+    def new_empty(self, shape: Tuple, dtype: Any = None) -> 'MockTensor':
+        """Allocate an uninitialized tensor of the given shape."""
+        return MockTensor(shape=tuple(shape))
+    
+    def new_zeros(self, shape: Tuple) -> 'MockTensor':
+        """Allocate a zero-filled tensor of the given shape."""
+        return MockTensor(shape=tuple(shape))
+    
+    def new_full(self, shape: Tuple, fill_value: float) -> 'MockTensor':
+        """Allocate a tensor of the given shape filled with ``fill_value``."""
+        return MockTensor(shape=tuple(shape))
 
 
-def concat(tensors: List[MockTensor], dim: int = 0) -> MockTensor:
-    """Concatenate mock tensors."""
-    if not tensors:
-        return MockTensor()
-    
-    new_shape = list(tensors[0].shape)
-    for t in tensors[1:]:
-        new_shape[dim] += t.shape[dim]
-    return MockTensor(shape=tuple(new_shape))
+class QuantizedKV:
+    """
+    Quantized view of cached keys or values.
+    
+    Holds the low-precision cache prefix plus fp32 scales of shape
+    ``[batch, seq, groups, 1]`` (one per head per token), and dequantizes
+    only what is sliced out, so attention tiles are expanded one at a time
+    and the full-precision cache is never materialized.
+    """
+    
+    def __init__(self, data: Any, scale: Any, dtype: Any):
+        self.data = data
+        self.scale = scale
+        self.dtype = dtype
+    
+    @property
+    def shape(self) -> Tuple:
+        return self.data.shape
+    
+    def __getitem__(self, key):
+        data = self.data[key]
+        scale = self.scale[key]
+        grouped = data.reshape(data.shape[0], data.shape[1], scale.shape[2], -1)
+        values = grouped.to(getattr(scale, "dtype", None)) * scale
+        return values.reshape(*data.shape).to(self.dtype)
+    
+    def dequantize(self) -> Any:
+        """Full-precision copy of the whole view."""
+        return self[:, :]
 
 
 class OptimizedAttention:
@@ -61,19 +177,49 @@ class OptimizedAttention:
     
     Features:
     - Chunked attention for memory efficiency
+    - Online-softmax (FlashAttention-2) accumulation over K/V tiles
     - KV cache for autoregressive generation
     - Optional causal masking
     - Configurable chunk size
+    - torch.Tensor inputs dispatch to ``F.scaled_dot_product_attention``
+      (FlashAttention-2 / memory-efficient kernels, fp16/bf16 on tensor cores)
+    
+    The KV cache is one contiguous buffer per K/V preallocated to
+    ``max_length`` and written in place, so appending a step costs
+    O(step) rather than re-concatenating the whole cache (O(N^2) total).
+    
+    With ``paged_kv_cache`` the cache is instead a pool of fixed-size
+    blocks shared by all sequences (PagedAttention-style): each sequence
+    id owns a block table, takes a block from the free list only when its
+    last block fills, and returns its blocks on ``clear_cache``. Memory
+    then tracks actual sequence lengths rather than ``max_length`` each.
+    
+    With ``kv_quant`` the contiguous cache stores K/V as symmetric int8
+    (or fp8 e4m3 on torch) with a per-head, per-token fp32 scale, halving the bytes read
+    per decode step; attention dequantizes tile by tile via ``QuantizedKV``.
     """
     
     def __init__(self, config: AttentionConfig = None):
         self.config = config or AttentionConfig()
         self._cache_k: Optional[MockTensor] = None
         self._cache_v: Optional[MockTensor] = None
+        self._cache_len = 0
+        self._cache_k_scale: Optional[MockTensor] = None
+        self._cache_v_scale: Optional[MockTensor] = None
+        
+        # Paged mode: block pool [num_blocks, batch, block_size, ...]
+        self._block_k: Optional[MockTensor] = None
+        self._block_v: Optional[MockTensor] = None
+        self._free_blocks: List[int] = []
+        self._block_tables: Dict[str, List[int]] = {}
+        self._seq_lens: Dict[str, int] = {}
+        
         self._stats = {
             "forward_calls": 0,
             "cache_hits": 0,
             "flash_chunks": 0,
+            "kv_blocks": 0,
+            "sdpa_calls": 0,
         }
     
     def forward(
@@ -83,6 +229,7 @@ class OptimizedAttention:
         value: MockTensor,
         mask: Optional[MockTensor] = None,
         use_cache: bool = True,
+        seq_id: str = "default",
     ) -> MockTensor:
         """
         Forward pass with optional caching.
@@ -93,6 +240,7 @@ class OptimizedAttention:
             value: Value tensor [batch, seq_len, hidden]
             mask: Optional attention mask
             use_cache: Whether to use KV caching
+            seq_id: Sequence owning the cache entries (paged mode)
         
         Returns:
             Attention output tensor
@@ -100,13 +248,135 @@ class OptimizedAttention:
         self._stats["forward_calls"] += 1
         
         if use_cache:
-            key, value = self._update_cache(key, value)
+            if self.config.paged_kv_cache:
+                key, value = self._update_paged_cache(seq_id, key, value)
+            else:
+                key, value = self._update_cache(key, value)
             self._stats["cache_hits"] += 1
         
+        if HAS_TORCH and isinstance(query, torch.Tensor):
+            if isinstance(key, QuantizedKV):
+                return self._quantized_tiled_attention(query, key, value, mask)
+            return self._sdpa_attention(query, key, value, mask)
         if self.config.use_flash_attention:
             return self._flash_attention(query, key, value, mask)
         return self._standard_attention(query, key, value, mask)
     
+    def _sdpa_attention(
+        self,
+        q: "torch.Tensor",
+        k: "torch.Tensor",
+        v: "torch.Tensor",
+        mask: Optional["torch.Tensor"],
+    ) -> "torch.Tensor":
+        """
+        Attention through PyTorch's fused kernel.
+        
+        ``[batch, seq, hidden]`` inputs are split into ``num_heads`` heads
+        of ``head_dim`` when the hidden size matches. An explicit mask takes
+        precedence over ``causal``; causal attention over a KV cache (more
+        keys than queries) aligns the queries with the last key positions.
+        """
+        self._stats["sdpa_calls"] += 1
+        batch, q_len, hidden = q.shape
+        k_len = k.shape[1]
+        split_heads = hidden == self.config.num_heads * self.config.head_dim
+        if split_heads:
+            q, k, v = (
+                t.reshape(batch, t.shape[1], self.config.num_heads, self.config.head_dim)
+                 .transpose(1, 2)
+                for t in (q, k, v)
+            )
+        
+        is_causal = False
+        if mask is None and self.config.causal and q_len > 1:
+            if q_len == k_len:
+                is_causal = True
+            else:
+                mask = torch.ones(q_len, k_len, dtype=torch.bool, device=q.device)
+                mask = mask.tril(diagonal=k_len - q_len)
+        elif mask is not None and split_heads and mask.dim() == 3:
+            mask = mask.unsqueeze(1)  # Broadcast over heads
+        
+        output = F.scaled_dot_product_attention(
+            q, k, v,
+            attn_mask=mask,
+            dropout_p=self.config.dropout,
+            is_causal=is_causal,
+        )
+        if split_heads:
+            output = output.transpose(1, 2).reshape(batch, q_len, hidden)
+        return output
+    
+    def _quantized_tiled_attention(
+        self,
+        q: "torch.Tensor",
+        k: QuantizedKV,
+        v: QuantizedKV,
+        mask: Optional["torch.Tensor"],
+    ) -> "torch.Tensor":
+        """
+        Attention over a quantized KV cache, dequantizing one tile at a time.
+        
+        Same head split and mask conventions as ``_sdpa_attention``, but
+        K/V are expanded ``chunk_size`` keys at a time and folded in with
+        an online softmax (computed in fp32), so no full-precision copy of
+        the cache is built. This trades the fused kernel for the memory
+        saving; ``dropout`` is not applied on this path.
+        """
+        self._stats["sdpa_calls"] += 1
+        batch, q_len, hidden = q.shape
+        k_len = k.shape[1]
+        num_heads, head_dim = self.config.num_heads, self.config.head_dim
+        split_heads = hidden == num_heads * head_dim
+        
+        def heads(t):
+            t = t.float()
+            if split_heads:
+                t = t.reshape(batch, t.shape[1], num_heads, head_dim).transpose(1, 2)
+            return t
+        
+        qh = heads(q)
+        scale = 1.0 / math.sqrt(qh.shape[-1])
+        causal = mask is None and self.config.causal and q_len > 1
+        if causal:
+            # Bottom-right aligned: query i sits at key position k_len - q_len + i
+            q_pos = torch.arange(k_len - q_len, k_len, device=q.device).unsqueeze(-1)
+        elif mask is not None and split_heads and mask.dim() == 3:
+            mask = mask.unsqueeze(1)  # Broadcast over heads
+        
+        row_shape = qh.shape[:-1] + (1,)
+        m = qh.new_full(row_shape, float("-inf"))
+        l = qh.new_zeros(row_shape)
+        o = None
+        
+        for j in range(0, k_len, self.config.chunk_size):
+            end = min(j + self.config.chunk_size, k_len)
+            scores = (qh @ heads(k[:, j:end]).transpose(-2, -1)) * scale
+            if causal:
+                k_pos = torch.arange(j, end, device=q.device)
+                scores = scores.masked_fill(k_pos > q_pos, float("-inf"))
+            elif mask is not None:
+                tile = mask[..., j:end]
+                if tile.dtype == torch.bool:
+                    scores = scores.masked_fill(~tile, float("-inf"))
+                else:
+                    scores = scores + tile
+            
+            m_new = torch.maximum(m, scores.amax(dim=-1, keepdim=True))
+            p = (scores - m_new).exp()
+            correction = (m - m_new).exp()
+            l = l * correction + p.sum(dim=-1, keepdim=True)
+            pv = p @ heads(v[:, j:end])
+            o = pv if o is None else o * correction + pv
+            m = m_new
+            self._stats["kv_blocks"] += 1
+        
+        output = o / l
+        if split_heads:
+            output = output.transpose(1, 2).reshape(batch, q_len, -1)
+        return output.to(q.dtype)
+    
     def _flash_attention(
         self,
         q: MockTensor,
@@ -117,25 +387,28 @@ class OptimizedAttention:
         """
         Chunked attention for memory efficiency.
         
-        Processes attention in chunks to reduce peak memory usage
-        from O(N^2) to O(N * chunk_size).
+        Processes queries in chunks of ``chunk_size``, each attending to
+        K/V tile by tile, so peak memory is O(chunk_size^2) rather than
+        O(N^2). Chunk outputs are written in place into one output buffer.
         """
         chunk_size = self.config.chunk_size
         seq_len = q.shape[1] if hasattr(q, 'shape') else 1
+        if seq_len <= chunk_size:
+            self._stats["flash_chunks"] += 1
+            return self._standard_attention(q, k, v, mask)
         
-        output_chunks = []
+        # Queries are the last seq_len positions of the (cached) keys
+        q_start = k.shape[1] - seq_len
+        output = q.new_empty(q.shape[:2] + (v.shape[-1],))
         for i in range(0, seq_len, chunk_size):
             end_idx = min(i + chunk_size, seq_len)
-            # Process chunk
-            q_chunk = MockTensor(shape=(q.shape[0], end_idx - i, q.shape[2]))
-            chunk_output = self._standard_attention(q_chunk, k, v, mask)
-            output_chunks.append(chunk_output)
+            chunk_mask = mask[:, i:end_idx] if mask is not None else None
+            output[:, i:end_idx] = self._standard_attention(
+                q[:, i:end_idx], k, v, chunk_mask, q_offset=q_start + i
+            )
             self._stats["flash_chunks"] += 1
         
-        # Concatenate chunks
-        if len(output_chunks) == 1:
-            return output_chunks[0]
-        return concat(output_chunks, dim=1)
+        return output
     
     def _standard_attention(
         self,
@@ -143,55 +416,273 @@ class OptimizedAttention:
         k: MockTensor,
         v: MockTensor,
         mask: Optional[MockTensor],
+        q_offset: Optional[int] = None,
     ) -> MockTensor:
         """
-        Standard scaled dot-product attention.
+        Scaled dot-product attention with an online softmax.
         
         Attention(Q, K, V) = softmax(QK^T / sqrt(d_k)) V
+        
+        K/V are consumed in tiles of ``chunk_size`` (FlashAttention-2,
+        Algorithm 1): per query row a running max ``m``, normalizer ``l``
+        and unnormalized output ``o`` are rescaled as each tile arrives, so
+        the full QK^T score matrix is never materialized. With causal
+        masking, tiles entirely after the last query position are skipped
+        and tiles crossing the diagonal get a -inf bias on future keys.
+        
+        Args:
+            q_offset: Key position of the first query (defaults to the
+                queries being the last positions of ``k``)
         """
         scale = 1.0 / math.sqrt(self.config.head_dim)
+        block = self.config.chunk_size
+        q_len, k_len = q.shape[1], k.shape[1]
+        if q_offset is None:
+            q_offset = k_len - q_len
+        if self.config.causal:
+            k_len = min(k_len, q_offset + q_len)
         
-        # Compute attention scores
-        scores = q @ k.transpose(-2, -1)
-        # Scale
-        scores = MockTensor(shape=scores.shape)  # Simulate scaling
+        row_shape = q.shape[:2] + (1,)
+        m = q.new_full(row_shape, float("-inf"))
+        l = q.new_zeros(row_shape)
+        o = q.new_zeros(q.shape[:2] + (v.shape[-1],))
         
-        # Apply mask if provided
-        if mask is not None:
-            scores = scores + mask
+        for j in range(0, k_len, block):
+            end = min(j + block, k_len)
+            scores = (q @ k[:, j:end].transpose(-2, -1)) * scale
+            if mask is not None:
+                scores = scores + mask[:, :, j:end]
+            if self.config.causal and end - 1 > q_offset:
+                scores = scores + self._causal_bias(q, q_offset - j, end - j)
+            
+            m_new = m.maximum(scores.amax(dim=-1, keepdim=True))
+            p = (scores - m_new).exp()
+            correction = (m - m_new).exp()
+            l = l * correction + p.sum(dim=-1, keepdim=True)
+            o = o * correction + p @ v[:, j:end]
+            m = m_new
+            self._stats["kv_blocks"] += 1
         
-        # Softmax (simulated)
-        # In real implementation: scores = softmax(scores, dim=-1)
+        return o / l
+    
+    @staticmethod
+    def _causal_bias(q: MockTensor, q_start: int, width: int) -> MockTensor:
+        """
+        Additive causal mask for one K/V tile.
         
-        # Apply to values
-        output = scores @ v
-        return output
+        ``q_start`` is the first query's position relative to the tile's
+        first key; each query row gets -inf on keys after its own position.
+        """
+        q_len = q.shape[1]
+        bias = q.new_zeros((1, q_len, width))
+        for row in range(min(q_len, width - 1 - q_start)):
+            bias[:, row, max(0, q_start + row + 1):] = float("-inf")
+        return bias
     
     def _update_cache(
         self,
         k: MockTensor,
         v: MockTensor,
     ) -> Tuple[MockTensor, MockTensor]:
-        """Update KV cache for autoregressive generation."""
-        if self._cache_k is None:
-            self._cache_k = k
-            self._cache_v = v
-        else:
-            self._cache_k = concat([self._cache_k, k], dim=1)
-            self._cache_v = concat([self._cache_v, v], dim=1)
+        """
+        Update KV cache for autoregressive generation.
+        
+        Writes the new keys/values into the preallocated buffers and
+        returns views over the filled prefix (``QuantizedKV`` views when
+        ``kv_quant`` is set).
+        """
+        start = self._cache_len
+        end = start + k.shape[1]
+        if self._cache_k is None or end > self._cache_k.shape[1]:
+            self._grow_cache(k, v, end)
+        
+        if self.config.kv_quant:
+            dtype = getattr(k, "dtype", None)
+            k, k_scale = self._quantize(k)
+            v, v_scale = self._quantize(v)
+            self._cache_k_scale[:, start:end] = k_scale
+            self._cache_v_scale[:, start:end] = v_scale
+        
+        self._cache_k[:, start:end] = k
+        self._cache_v[:, start:end] = v
+        self._cache_len = end
+        
+        if self.config.kv_quant:
+            return (
+                QuantizedKV(self._cache_k[:, :end], self._cache_k_scale[:, :end], dtype),
+                QuantizedKV(self._cache_v[:, :end], self._cache_v_scale[:, :end], dtype),
+            )
+        return self._cache_k[:, :end], self._cache_v[:, :end]
+    
+    def _quantize(self, x: MockTensor) -> Tuple[MockTensor, MockTensor]:
+        """
+        Symmetric per-head, per-token quantization: returns (values, scale).
+        
+        Each head gets its own scale so one large head cannot crush the
+        others' resolution. Scales are computed and kept in fp32, where the
+        all-zero floor cannot underflow to 0 as it would in fp16.
+        """
+        groups = self._kv_scale_groups(x)
+        grouped = x.reshape(x.shape[0], x.shape[1], groups, -1).to(self._kv_scale_dtype())
+        scale = grouped.abs().amax(dim=-1, keepdim=True) / _KV_QUANT_RANGES[self.config.kv_quant]
+        scale = scale.clamp(min=1e-30)  # All-zero heads
+        scaled = grouped / scale
+        if self.config.kv_quant == "int8":
+            scaled = scaled.round()
+        return scaled.reshape(*x.shape).to(self._kv_storage_dtype()), scale
+    
+    def _kv_scale_groups(self, x: MockTensor) -> int:
+        """Heads per token sharing a scale: num_heads when the layout matches, else 1."""
+        features = math.prod(x.shape[2:])
+        if features == self.config.num_heads * self.config.head_dim:
+            return self.config.num_heads
+        return 1
+    
+    @staticmethod
+    def _kv_scale_dtype() -> Any:
+        """Element type of KV quantization scales (None for the mock)."""
+        return torch.float32 if HAS_TORCH else None
+    
+    def _kv_storage_dtype(self) -> Any:
+        """Element type of the quantized cache (None for the mock)."""
+        if not HAS_TORCH:
+            return None
+        if self.config.kv_quant == "int8":
+            return torch.int8
+        return torch.float8_e4m3fn
+    
+    def _grow_cache(self, k: MockTensor, v: MockTensor, needed: int) -> None:
+        """(Re)allocate cache buffers; capacity doubles so growth is amortized O(1)."""
+        capacity = max(self.config.max_length, needed)
+        if self._cache_k is not None:
+            capacity = max(capacity, 2 * self._cache_k.shape[1])
         
-        return self._cache_k, self._cache_v
+        quantized = bool(self.config.kv_quant)
+        dtype = self._kv_storage_dtype() if quantized else getattr(k, "dtype", None)
+        new_k = k.new_empty((k.shape[0], capacity) + tuple(k.shape[2:]), dtype=dtype)
+        new_v = v.new_empty((v.shape[0], capacity) + tuple(v.shape[2:]), dtype=dtype)
+        if self._cache_len:
+            new_k[:, :self._cache_len] = self._cache_k[:, :self._cache_len]
+            new_v[:, :self._cache_len] = self._cache_v[:, :self._cache_len]
+        
+        if quantized:
+            scale_shape = (capacity, self._kv_scale_groups(k), 1)
+            scale_dtype = self._kv_scale_dtype()
+            new_k_scale = k.new_empty((k.shape[0],) + scale_shape, dtype=scale_dtype)
+            new_v_scale = v.new_empty((v.shape[0],) + scale_shape, dtype=scale_dtype)
+            if self._cache_len:
+                new_k_scale[:, :self._cache_len] = self._cache_k_scale[:, :self._cache_len]
+                new_v_scale[:, :self._cache_len] = self._cache_v_scale[:, :self._cache_len]
+            self._cache_k_scale = new_k_scale
+            self._cache_v_scale = new_v_scale
+        
+        self._cache_k = new_k
+        self._cache_v = new_v
+    
+    def _update_paged_cache(
+        self,
+        seq_id: str,
+        k: MockTensor,
+        v: MockTensor,
+    ) -> Tuple[MockTensor, MockTensor]:
+        """
+        Append keys/values for ``seq_id`` into its blocks.
+        
+        A new block is taken from the free list whenever the sequence's
+        last block is full. Returns the sequence's K/V gathered through
+        its block table.
+        """
+        block_size = self.config.block_size
+        table = self._block_tables.setdefault(seq_id, [])
+        length = self._seq_lens.get(seq_id, 0)
+        
+        offset = 0
+        k_len = k.shape[1]
+        while offset < k_len:
+            pos = length % block_size
+            if pos == 0:
+                table.append(self._allocate_block(k, v))
+            n = min(block_size - pos, k_len - offset)
+            block = table[-1]
+            self._block_k[block, :, pos:pos + n] = k[:, offset:offset + n]
+            self._block_v[block, :, pos:pos + n] = v[:, offset:offset + n]
+            offset += n
+            length += n
+        
+        self._seq_lens[seq_id] = length
+        return self._gather_blocks(seq_id, k, v)
+    
+    def _allocate_block(self, k: MockTensor, v: MockTensor) -> int:
+        """Take a free block, growing (doubling) the pool if none are left."""
+        if not self._free_blocks:
+            self._grow_block_pool(k, v)
+        return self._free_blocks.pop()
+    
+    def _grow_block_pool(self, k: MockTensor, v: MockTensor) -> None:
+        """(Re)allocate the block pool, keeping existing blocks in place."""
+        old_blocks = 0 if self._block_k is None else self._block_k.shape[0]
+        num_blocks = max(self.config.num_blocks, 2 * old_blocks)
+        block_shape = (k.shape[0], self.config.block_size) + tuple(k.shape[2:])
+        
+        new_k = k.new_empty((num_blocks,) + block_shape)
+        new_v = v.new_empty((num_blocks,) + block_shape)
+        if old_blocks:
+            new_k[:old_blocks] = self._block_k
+            new_v[:old_blocks] = self._block_v
+        
+        self._block_k = new_k
+        self._block_v = new_v
+        # Pop from the end, so hand out low block ids first
+        self._free_blocks.extend(range(num_blocks - 1, old_blocks - 1, -1))
+    
+    def _gather_blocks(
+        self,
+        seq_id: str,
+        k: MockTensor,
+        v: MockTensor,
+    ) -> Tuple[MockTensor, MockTensor]:
+        """Materialize a sequence's K/V contiguously from its block table."""
+        block_size = self.config.block_size
+        length = self._seq_lens[seq_id]
+        out_k = k.new_empty((k.shape[0], length) + tuple(k.shape[2:]))
+        out_v = v.new_empty((v.shape[0], length) + tuple(v.shape[2:]))
+        
+        for i, block in enumerate(self._block_tables[seq_id]):
+            start = i * block_size
+            n = min(block_size, length - start)
+            out_k[:, start:start + n] = self._block_k[block, :, :n]
+            out_v[:, start:start + n] = self._block_v[block, :, :n]
+        
+        return out_k, out_v
     
-    def clear_cache(self) -> None:
-        """Clear KV cache."""
+    def clear_cache(self, seq_id: Optional[str] = None) -> None:
+        """
+        Clear KV cache.
+        
+        In paged mode, ``seq_id`` releases only that sequence's blocks
+        back to the pool; without it every sequence is released.
+        """
+        if seq_id is not None:
+            self._free_blocks.extend(self._block_tables.pop(seq_id, []))
+            self._seq_lens.pop(seq_id, None)
+            return
+        
         self._cache_k = None
         self._cache_v = None
+        self._cache_k_scale = None
+        self._cache_v_scale = None
+        self._cache_len = 0
+        
+        for table in self._block_tables.values():
+            self._free_blocks.extend(table)
+        self._block_tables.clear()
+        self._seq_lens.clear()
     
     def get_cache_size(self) -> int:
         """Get current cache size in elements."""
-        if self._cache_k is None:
-            return 0
-        return self._cache_k.shape[1]
+        if self.config.paged_kv_cache:
+            return sum(self._seq_lens.values())
+        return self._cache_len
     
     def get_stats(self) -> dict:
         """Get attention statistics."""
@@ -8,9 +8,9 @@ Bridges Ryot's inference context management to persistent RSU storage.
 
 from typing import Optional, Tuple, List
 from dataclasses import dataclass
-import hashlib
 import pickle
 
+from ..api.hashing import compute_semantic_hash
 from ..api.interfaces import RSUManagerProtocol
 from ..api.types import (
     TokenSequence, KVCacheState, RSUReference,
@@ -29,6 +29,7 @@ class RSUManagerConfig:
     auto_store: bool = True
     store_kv_cache: bool = True
     max_stored_rsus: int = 10000
+    security_mode: bool = False  # SHA-256 RSU keys instead of xxh3
 
 
 class RyotRSUManager:
@@ -299,17 +300,7 @@ class RyotRSUManager:
     
     def _compute_hash(self, tokens: TokenSequence) -> int:
         """Compute semantic hash for tokens."""
-        import hashlib
-        
-        # Extract bytes from tokens
-        if hasattr(tokens, 'tokens'):
-            token_bytes = bytes(t % 256 for t in tokens.tokens[:128])
-        else:
-            token_bytes = bytes(tokens[:128]) if isinstance(tokens, (list, tuple)) else str(tokens).encode()
-        
-        hash_bytes = hashlib.sha256(token_bytes).digest()
-        
-        return int.from_bytes(hash_bytes[:8], 'little')
+        return compute_semantic_hash(tokens, self.config.security_mode)
     
     def _serialize_tokens(self, tokens: TokenSequence) -> bytes:
         """Serialize tokens to bytes."""
@@ -10,6 +10,7 @@ from typing import Optional, Tuple
 from dataclasses import dataclass
 
 from .rsu_manager import RyotRSUManager, RSUManagerConfig
+from ..api.hashing import compute_semantic_hash
 from ..api.interfaces import RSUManagerProtocol
 from ..api.types import (
     TokenSequence, SigmaEncodedContext, CompressionResult,
@@ -25,6 +26,7 @@ class SigmaConfig:
     max_rsu_chain_depth: int = 10
     auto_store_rsu: bool = True
     compression_level: int = 3
+    security_mode: bool = False  # SHA-256 RSU keys instead of xxh3
 
 
 @dataclass
@@ -65,6 +67,7 @@ class SigmaIntegration:
                 similarity_threshold=self.config.rsu_similarity_threshold,
                 max_chain_depth=self.config.max_rsu_chain_depth,
                 auto_store=self.config.auto_store_rsu,
+                security_mode=self.config.security_mode,
             )
             try:
                 rsu_manager = RyotRSUManager(config=rsu_config)
@@ -212,14 +215,4 @@ class SigmaIntegration:
     
     def _compute_semantic_hash(self, tokens: TokenSequence) -> int:
         """Compute semantic hash for tokens."""
-        import hashlib
-        
-        if hasattr(tokens, 'tokens'):
-            token_bytes = bytes(t % 256 for t in tokens.tokens[:128])
-        elif isinstance(tokens, (list, tuple)):
-            token_bytes = bytes(t % 256 for t in tokens[:128])
-        else:
-            token_bytes = str(tokens).encode()
-        
-        hash_bytes = hashlib.sha256(token_bytes).digest()
-        return int.from_bytes(hash_bytes[:8], 'little')
+        return compute_semantic_hash(tokens, self.config.security_mode)
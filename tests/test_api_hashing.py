@@ -0,0 +1,72 @@
+"""
+Semantic Hashing Tests
+======================
+
+Tests for src/api/hashing.py and the components keying RSUs with it.
+"""
+
+import hashlib
+
+import pytest
+
+from src.api import hashing
+from src.api.hashing import compute_semantic_hash
+from src.api.types import TokenSequence
+from src.core.engine.inference import InferenceEngine
+
+TOKENS = list(range(-300, 300, 7))
+
+
+def sha256_key(tokens):
+    """Reference SHA-256 key over the low byte of the first 128 tokens."""
+    digest = hashlib.sha256(bytes(t % 256 for t in tokens[:128])).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+class TestComputeSemanticHash:
+    """Test the shared RSU key function."""
+
+    def test_security_mode_forces_sha256(self, monkeypatch):
+        """Test security_mode never reaches xxh3, even when it is available."""
+        monkeypatch.setattr(hashing, 'HAS_XXHASH', True)
+
+        assert compute_semantic_hash(TOKENS, security_mode=True) == sha256_key(TOKENS)
+
+    def test_sha256_without_xxhash(self, monkeypatch):
+        """Test the key falls back to SHA-256 when xxhash is not installed."""
+        monkeypatch.setattr(hashing, 'HAS_XXHASH', False)
+
+        assert compute_semantic_hash(TOKENS) == sha256_key(TOKENS)
+
+    def test_xxh3_by_default(self):
+        """Test the fast mode uses xxh3-64 over the same bytes."""
+        xxhash = pytest.importorskip("xxhash")
+        token_bytes = bytes(t % 256 for t in TOKENS[:128])
+
+        assert compute_semantic_hash(TOKENS) == xxhash.xxh3_64_intdigest(token_bytes)
+
+    def test_token_sequence_matches_list(self):
+        """Test a TokenSequence hashes like its token list."""
+        sequence = TokenSequence.from_list(TOKENS)
+
+        assert compute_semantic_hash(sequence) == compute_semantic_hash(TOKENS)
+
+
+@pytest.mark.parametrize("security_mode", [False, True])
+def test_components_share_key(security_mode):
+    """Test the engine, ΣLANG integration and RSU manager agree on the key."""
+    sigma_integration = pytest.importorskip("src.integrations.sigma_integration")
+    rsu_manager = pytest.importorskip("src.integrations.rsu_manager")
+    sigma = sigma_integration.SigmaIntegration(
+        config=sigma_integration.SigmaConfig(enable_rsu=False, security_mode=security_mode),
+    )
+    manager = rsu_manager.RyotRSUManager(
+        config=rsu_manager.RSUManagerConfig(enabled=False, security_mode=security_mode),
+    )
+    engine = InferenceEngine(sigma_integration=sigma)
+    tokens = TokenSequence.from_list(TOKENS)
+
+    expected = compute_semantic_hash(TOKENS, security_mode)
+    assert sigma._compute_semantic_hash(tokens) == expected
+    assert manager._compute_hash(tokens) == expected
+    assert engine._compute_semantic_hash(tokens) == expected
@@ -0,0 +1,101 @@
+"""
+API Types Tests
+===============
+
+Tests for serialization helpers in src/api/types.py.
+"""
+
+import pickle
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from src.api.types import KVCacheState, SigmaEncodedContext
+
+
+class TestKVCacheStateExport:
+    """Test KV cache state export/import."""
+
+    def test_export_copies_payload_once(self):
+        """Test export allocates the frame once, with no second full-size copy."""
+        keys = np.ones((4, 1 << 20), dtype=np.uint8)  # 4 MiB each
+        state = KVCacheState(keys, keys.copy(), sequence_length=4)
+        payload = keys.nbytes * 2
+
+        tracemalloc.start()
+        try:
+            data = state.export()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert isinstance(data, bytearray)
+        assert len(data) >= payload
+        assert peak < payload * 1.5
+
+    def test_round_trip(self):
+        """Test framed export restores key/value arrays and length."""
+        keys = np.arange(24, dtype=np.float32).reshape(2, 3, 4)
+        values = -keys
+        state = KVCacheState(keys, values, sequence_length=3)
+
+        restored = KVCacheState.import_from(state.export())
+
+        assert restored.sequence_length == 3
+        assert np.array_equal(restored.key_states, keys)
+        assert np.array_equal(restored.value_states, values)
+
+    def test_round_trip_out_of_band_buffers(self):
+        """Test export with a caller-held buffer list restores the arrays."""
+        keys = np.arange(12, dtype=np.float16).reshape(3, 4)
+        state = KVCacheState(keys, keys * 2, sequence_length=3)
+        buffers = []
+
+        body = state.export(buffers)
+        restored = KVCacheState.import_from(body, buffers=buffers)
+
+        assert len(buffers) == 2
+        assert np.array_equal(restored.value_states, keys * 2)
+
+    def test_imports_legacy_pickle(self):
+        """Test plain-pickle exports from older versions still import."""
+        state = KVCacheState(np.zeros((2, 2)), None, sequence_length=2)
+
+        restored = KVCacheState.import_from(pickle.dumps(state))
+
+        assert restored.sequence_length == 2
+        assert np.array_equal(restored.key_states, np.zeros((2, 2)))
+
+    @pytest.mark.parametrize("sequence_length", [0, 128, 2**64, np.int64(7)])
+    def test_export_fast_round_trip(self, sequence_length):
+        """Test metadata-only states round-trip, even past msgpack's range."""
+        state = KVCacheState(sequence_length=sequence_length)
+
+        restored = KVCacheState.import_from(state.export_fast())
+
+        assert restored.sequence_length == sequence_length
+        assert restored.key_states is None
+
+
+class TestSigmaEncodedContextExport:
+    """Test ΣLANG context export/import."""
+
+    @pytest.mark.parametrize("semantic_hash", [0, 2**63, 2**64 - 1, 2**64, 2**80, -(2**70)])
+    def test_round_trip(self, semantic_hash):
+        """Test any Python int hash survives export/import unchanged."""
+        context = SigmaEncodedContext(b"\x00\xffglyphs", semantic_hash, 1700000000, 3.5)
+
+        restored = SigmaEncodedContext.import_from(context.export())
+
+        assert restored == context
+
+    @pytest.mark.parametrize("semantic_hash", [np.uint64(2**64 - 1), np.int32(-5)])
+    def test_round_trip_numpy_hash(self, semantic_hash):
+        """Test numpy integer hashes fall back to pickle and keep their type."""
+        context = SigmaEncodedContext(b"glyphs", semantic_hash, 1700000000, 2.0)
+
+        restored = SigmaEncodedContext.import_from(context.export())
+
+        assert restored.semantic_hash == semantic_hash
+        assert type(restored.semantic_hash) is type(semantic_hash)
@@ -0,0 +1,236 @@
+"""
+Optimized Attention Tests
+=========================
+
+Tests for src/core/engine/optimized_attention.py.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from src.core.engine.optimized_attention import (
+    AttentionConfig,
+    OptimizedAttention,
+    QuantizedKV,
+)
+
+
+class ArrayTensor:
+    """numpy-backed tensor exposing the MockTensor interface the non-torch path uses."""
+
+    dtype = None
+
+    def __init__(self, data):
+        self.data = np.asarray(data, dtype=np.float64)
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @staticmethod
+    def _raw(other):
+        return other.data if isinstance(other, ArrayTensor) else other
+
+    def __matmul__(self, other):
+        return ArrayTensor(self.data @ other.data)
+
+    def __add__(self, other):
+        return ArrayTensor(self.data + self._raw(other))
+
+    def __sub__(self, other):
+        return ArrayTensor(self.data - self._raw(other))
+
+    def __mul__(self, other):
+        return ArrayTensor(self.data * self._raw(other))
+
+    def __truediv__(self, other):
+        return ArrayTensor(self.data / self._raw(other))
+
+    def __getitem__(self, key):
+        return ArrayTensor(self.data[key])
+
+    def __setitem__(self, key, value):
+        self.data[key] = self._raw(value)
+
+    def reshape(self, *shape):
+        return ArrayTensor(self.data.reshape(shape))
+
+    def transpose(self, dim1, dim2):
+        return ArrayTensor(np.swapaxes(self.data, dim1, dim2))
+
+    def maximum(self, other):
+        return ArrayTensor(np.maximum(self.data, other.data))
+
+    def exp(self):
+        return ArrayTensor(np.exp(self.data))
+
+    def abs(self):
+        return ArrayTensor(np.abs(self.data))
+
+    def round(self):
+        return ArrayTensor(np.round(self.data))
+
+    def clamp(self, min=None, max=None):
+        return ArrayTensor(np.clip(self.data, min, max))
+
+    def to(self, dtype):
+        return ArrayTensor(self.data)
+
+    def amax(self, dim=-1, keepdim=False):
+        return ArrayTensor(self.data.max(axis=dim, keepdims=keepdim))
+
+    def sum(self, dim=-1, keepdim=False):
+        return ArrayTensor(self.data.sum(axis=dim, keepdims=keepdim))
+
+    def new_empty(self, shape, dtype=None):
+        return ArrayTensor(np.full(shape, np.nan))
+
+    def new_zeros(self, shape):
+        return ArrayTensor(np.zeros(shape))
+
+    def new_full(self, shape, fill_value):
+        return ArrayTensor(np.full(shape, fill_value))
+
+
+def reference_attention(q, k, v, head_dim, causal):
+    """Dense softmax(QK^T / sqrt(d)) V, causal aligned to the last keys."""
+    scores = q @ np.swapaxes(k, -2, -1) / math.sqrt(head_dim)
+    if causal:
+        q_len, k_len = q.shape[1], k.shape[1]
+        q_pos = np.arange(k_len - q_len, k_len)[:, None]
+        scores = np.where(np.arange(k_len) > q_pos, -np.inf, scores)
+    weights = np.exp(scores - scores.max(axis=-1, keepdims=True))
+    return (weights / weights.sum(axis=-1, keepdims=True)) @ v
+
+
+def run_steps(attention, steps, **kwargs):
+    """Feed (q, k, v) steps through attention; return outputs and the full K/V."""
+    outputs = [attention.forward(*map(ArrayTensor, step), **kwargs).data for step in steps]
+    keys = np.concatenate([k for _, k, _ in steps], axis=1)
+    values = np.concatenate([v for _, _, v in steps], axis=1)
+    return outputs, keys, values
+
+
+def make_steps(rng, lengths, hidden=8):
+    """Random prompt-then-decode (q, k, v) steps of the given lengths."""
+    return [tuple(rng.standard_normal((1, n, hidden)) for _ in range(3)) for n in lengths]
+
+
+def expected_outputs(steps, head_dim, causal):
+    """Reference output of each step against every key cached so far."""
+    outputs = []
+    for i, (q, _, _) in enumerate(steps):
+        keys = np.concatenate([k for _, k, _ in steps[:i + 1]], axis=1)
+        values = np.concatenate([v for _, _, v in steps[:i + 1]], axis=1)
+        outputs.append(reference_attention(q, keys, values, head_dim, causal))
+    return outputs
+
+
+class TestCachedAttention:
+    """Test cached attention against dense reference attention."""
+
+    @pytest.mark.parametrize("causal", [True, False])
+    @pytest.mark.parametrize("use_flash", [True, False])
+    def test_contiguous_cache_matches_reference(self, causal, use_flash):
+        """Test prompt plus decode steps over the contiguous cache."""
+        config = AttentionConfig(
+            head_dim=8, chunk_size=8, causal=causal, max_length=4,
+            use_flash_attention=use_flash,
+        )
+        steps = make_steps(np.random.default_rng(0), [19, 1, 1, 3])
+
+        outputs, _, _ = run_steps(OptimizedAttention(config), steps)
+
+        for out, expected in zip(outputs, expected_outputs(steps, 8, causal)):
+            np.testing.assert_allclose(out, expected, atol=1e-12)
+
+    def test_paged_cache_matches_reference(self):
+        """Test interleaved sequences in the paged block pool stay independent."""
+        config = AttentionConfig(
+            head_dim=8, chunk_size=8, paged_kv_cache=True, block_size=4, num_blocks=2,
+        )
+        attention = OptimizedAttention(config)
+        rng = np.random.default_rng(1)
+        steps = {"a": make_steps(rng, [7, 1, 1]), "b": make_steps(rng, [5, 1, 1])}
+
+        outputs = {"a": [], "b": []}
+        for i in range(3):
+            for seq_id in ("a", "b"):
+                step = map(ArrayTensor, steps[seq_id][i])
+                outputs[seq_id].append(attention.forward(*step, seq_id=seq_id).data)
+
+        for seq_id in ("a", "b"):
+            for out, expected in zip(outputs[seq_id], expected_outputs(steps[seq_id], 8, True)):
+                np.testing.assert_allclose(out, expected, atol=1e-12)
+
+    def test_paged_clear_releases_blocks(self):
+        """Test clearing one sequence returns only its blocks to the pool."""
+        config = AttentionConfig(head_dim=8, paged_kv_cache=True, block_size=4, num_blocks=8)
+        attention = OptimizedAttention(config)
+        rng = np.random.default_rng(2)
+        run_steps(attention, make_steps(rng, [9]), seq_id="a")  # 3 blocks
+        run_steps(attention, make_steps(rng, [4]), seq_id="b")  # 1 block
+        free = len(attention._free_blocks)
+
+        attention.clear_cache("a")
+
+        assert len(attention._free_blocks) == free + 3
+        assert attention.get_cache_size() == 4
+
+    def test_int8_cache_close_to_reference(self):
+        """Test the int8 quantized cache stays within quantization error."""
+        config = AttentionConfig(head_dim=8, chunk_size=8, kv_quant="int8")
+        attention = OptimizedAttention(config)
+        steps = make_steps(np.random.default_rng(3), [19, 1, 1])
+
+        outputs, _, _ = run_steps(attention, steps)
+
+        for out, expected in zip(outputs, expected_outputs(steps, 8, True)):
+            np.testing.assert_allclose(out, expected, atol=2e-2)
+
+    @pytest.mark.parametrize("shape", [(1, 5, 8), (1, 5, 2, 4)])
+    def test_int8_cache_scales_each_head(self, shape):
+        """Test a large head does not set the quantization scale of a small one."""
+        config = AttentionConfig(num_heads=2, head_dim=4, kv_quant="int8")
+        attention = OptimizedAttention(config)
+        rng = np.random.default_rng(4)
+        grouped = rng.standard_normal((1, 5, 2, 4)) * np.array([1000.0, 0.01])[:, None]
+        keys = grouped.reshape(shape)
+
+        cached, _ = attention._update_cache(ArrayTensor(keys), ArrayTensor(keys))
+
+        assert attention._cache_k_scale.shape[1:] == (config.max_length, 2, 1)
+        assert cached.shape == shape
+        restored = cached.dequantize().data.reshape(grouped.shape)
+        for head in range(2):
+            bound = np.abs(grouped[..., head, :]).max() / 127
+            np.testing.assert_allclose(restored[..., head, :], grouped[..., head, :], atol=bound)
+
+
+class TestTorchQuantizedCache:
+    """Test the torch path over a quantized KV cache."""
+
+    @pytest.mark.parametrize("causal", [True, False])
+    def test_tiled_matches_dequantized_sdpa(self, causal):
+        """Test tile-by-tile dequantization matches SDPA on the full copy."""
+        torch = pytest.importorskip("torch")
+        torch.manual_seed(0)
+        config = dict(num_heads=2, head_dim=4, chunk_size=8, causal=causal, max_length=64)
+        quantized = OptimizedAttention(AttentionConfig(kv_quant="int8", **config))
+        reference = OptimizedAttention(AttentionConfig(**config))
+
+        prompt = [torch.randn(1, 19, 8) for _ in range(3)]
+        quantized.forward(*prompt)
+        blocks = quantized.get_stats()["kv_blocks"]
+        step = [torch.randn(1, 1, 8) for _ in range(3)]
+        out = quantized.forward(*step)
+
+        n = quantized._cache_len
+        key = QuantizedKV(quantized._cache_k[:, :n], quantized._cache_k_scale[:, :n], torch.float32)
+        value = QuantizedKV(quantized._cache_v[:, :n], quantized._cache_v_scale[:, :n], torch.float32)
+        expected = reference._sdpa_attention(step[0], key.dequantize(), value.dequantize(), None)
+
+        assert quantized.get_stats()["kv_blocks"] - blocks == 3  # 20 keys in tiles of 8
+        assert torch.allclose(out, expected, atol=1e-5)
@@ -0,0 +1,242 @@
+"""
+Batch Inference Scheduler Tests
+===============================
+
+Tests for the continuous-batching scheduler in src/core/engine/batch_inference.py.
+"""
+
+import pytest
+
+from src.core.engine.batch_inference import (
+    BatchConfig,
+    BatchInferenceEngine,
+    MockEngine,
+    _SENTINEL,
+    prompt_token_count,
+)
+
+
+@pytest.fixture
+def make_engine():
+    """Create started engines and stop them after the test."""
+    engines = []
+
+    def _make(backend=None, **config):
+        engine = BatchInferenceEngine(backend or MockEngine(), BatchConfig(**config))
+        engine.start()
+        engines.append(engine)
+        return engine
+
+    yield _make
+    for engine in engines:
+        engine.stop()
+
+
+class RecordingEngine(MockEngine):
+    """MockEngine recording prefill chunks and decode batches."""
+
+    def __init__(self, fail_prompt=None):
+        super().__init__()
+        self.fail_prompt = fail_prompt
+        self.chunks = {}
+        self.decode_batches = []
+
+    def prefill_chunk(self, request, start, end):
+        if request.prompt == self.fail_prompt:
+            raise RuntimeError("prefill failed")
+        self.chunks.setdefault(request.prompt, []).append((start, end))
+        super().prefill_chunk(request, start, end)
+
+    def decode_step(self, requests):
+        self.decode_batches.append([r.estimated_tokens for r in requests])
+        return super().decode_step(requests)
+
+
+def expected_text(prompt, max_tokens=256):
+    """What MockEngine generates for a prompt."""
+    return " ".join(f"Response to: {prompt[:50]}...".split()[:min(max_tokens, 50)])
+
+
+class TestAdmission:
+    """Test continuous-batching admission."""
+
+    def test_results_match_prompts(self, make_engine):
+        """Test every request gets its own completion."""
+        engine = make_engine(max_batch_size=3)
+        prompts = [f"prompt number {i}" for i in range(10)]
+
+        ids = [engine.submit_prompt(p, max_tokens=4) for p in prompts]
+        results = [engine.get_result(request_id, timeout=5) for request_id in ids]
+
+        assert [r.result for r in results] == [expected_text(p, 4) for p in prompts]
+        assert engine.get_stats().total_requests == 10
+
+    def test_respects_max_batch_size(self, make_engine):
+        """Test no decode step runs more than max_batch_size sequences."""
+        recorder = RecordingEngine()
+        engine = make_engine(recorder, max_batch_size=3)
+
+        ids = [engine.submit_prompt(f"p {i}") for i in range(12)]
+
+        assert all(engine.get_result(request_id, timeout=5) for request_id in ids)
+        assert max(map(len, recorder.decode_batches)) <= 3
+
+    def test_respects_token_budget(self, make_engine):
+        """Test in-flight estimated tokens never exceed max_batch_tokens."""
+        recorder = RecordingEngine()
+        # Each request is 2 prompt + 20 decode tokens; only two fit
+        engine = make_engine(recorder, max_batch_size=8, max_batch_tokens=50)
+
+        ids = [engine.submit_prompt(f"p {i}", max_tokens=20) for i in range(6)]
+        results = [engine.get_result(request_id, timeout=5) for request_id in ids]
+
+        assert all(r.error is None for r in results)
+        assert max(map(sum, recorder.decode_batches)) <= 50
+
+    def test_sequential_without_continuous_batching(self, make_engine):
+        """Test the one-shot generate path when continuous batching is off."""
+        engine = make_engine(enable_continuous_batching=False)
+
+        result = engine.get_result(engine.submit_prompt("hello there"), timeout=5)
+
+        assert result.result == "Response to: hello there..."
+
+
+class TestChunkedPrefill:
+    """Test chunked prefill scheduling."""
+
+    def test_prompt_prefilled_in_chunks(self, make_engine):
+        """Test a long prompt is prefilled in prefill_chunk_size pieces."""
+        recorder = RecordingEngine()
+        engine = make_engine(recorder, prefill_chunk_size=3)
+        prompt = " ".join(f"w{i}" for i in range(10))
+
+        result = engine.get_result(engine.submit_prompt(prompt, max_tokens=4), timeout=5)
+
+        assert recorder.chunks[prompt] == [(0, 3), (3, 6), (6, 9), (9, 10)]
+        assert result.result == expected_text(prompt, 4)
+
+    def test_prefill_error_fails_only_that_request(self, make_engine):
+        """Test a failing prefill completes its request with the error."""
+        engine = make_engine(RecordingEngine(fail_prompt="bad"))
+
+        bad_result = engine.get_result(engine.submit_prompt("bad"), timeout=5)
+        good_result = engine.get_result(engine.submit_prompt("good"), timeout=5)
+
+        assert bad_result.error == "prefill failed"
+        assert good_result.result == expected_text("good")
+
+    def test_prompt_token_count_any_whitespace(self):
+        """Test prompt length counts words separated by any whitespace."""
+        assert prompt_token_count("line1\nline2\tline3") == 3
+        assert prompt_token_count("  a   b ") == 2
+        assert prompt_token_count("") == 1
+
+    @pytest.mark.parametrize("prompt", [
+        "line1\nline2\nline3",
+        "tab\tseparated\twords",
+        "mixed \n whitespace\r\n here  ",
+    ])
+    def test_non_space_whitespace_completes(self, make_engine, prompt):
+        """Test prompts with newlines/tabs finish prefill and generate."""
+        engine = make_engine(prefill_chunk_size=1)
+
+        result = engine.get_result(engine.submit_prompt(prompt, max_tokens=8), timeout=5)
+
+        assert result is not None
+        assert result.error is None
+        assert result.result
+
+
+class TestShutdown:
+    """Test stop() resolves outstanding requests."""
+
+    def test_stop_fails_queued_requests(self):
+        """Test requests queued on a stopped engine are failed, not left hanging."""
+        engine = BatchInferenceEngine(MockEngine())
+        ids = [engine.submit_prompt(f"prompt {i}") for i in range(3)]
+
+        engine.stop()
+
+        for request_id in ids:
+            result = engine.get_result(request_id, timeout=1)
+            assert result is not None
+            assert result.error == "Batch engine stopped"
+        assert engine.queue_size() == 0
+
+    def test_stop_resolves_in_flight_requests(self, make_engine):
+        """Test every waiter returns after stop() while work is in flight."""
+        engine = make_engine(max_batch_size=2)
+        ids = [engine.submit_prompt(f"prompt {i}", max_tokens=50) for i in range(20)]
+
+        engine.stop()
+
+        results = [engine.get_result(request_id, timeout=2) for request_id in ids]
+        assert all(r is not None for r in results)
+        assert all(r.result or r.error for r in results)
+
+    def test_queue_size_ignores_sentinel(self):
+        """Test a pending stop sentinel is not counted as a request."""
+        engine = BatchInferenceEngine(MockEngine())
+        engine.submit_prompt("hello")
+        engine._queue.put(_SENTINEL)
+
+        assert engine.queue_size() == 1
+
+
+class TestLengthBucketing:
+    """Test length-bucketed batch collection."""
+
+    @staticmethod
+    def _engine(**config):
+        return BatchInferenceEngine(
+            MockEngine(),
+            BatchConfig(max_batch_size=2, enable_length_bucketing=True, **config),
+        )
+
+    def test_batches_shortest_requests(self):
+        """Test fresh requests are batched shortest first."""
+        engine = self._engine()
+        long_id = engine.submit_prompt("word " * 200, max_tokens=8)
+        short_ids = {engine.submit_prompt("hi", max_tokens=8) for _ in range(3)}
+
+        batch = engine._collect_bucketed_batch()
+
+        assert {r.request_id for r in batch} <= short_ids
+        assert engine.queue_size() == 2
+        assert long_id not in {r.request_id for r in batch}
+
+    def test_overdue_request_not_starved(self):
+        """Test a request older than max_queue_delay_ms jumps the length sort."""
+        engine = self._engine(max_queue_delay_ms=100.0)
+        long_id = engine.submit_prompt("word " * 200, max_tokens=8)
+        for _ in range(3):
+            engine.submit_prompt("hi", max_tokens=8)
+        engine._queue.queue[0].submitted_at -= 1.0
+
+        batch = engine._collect_bucketed_batch()
+
+        assert batch[0].request_id == long_id
+
+    @pytest.mark.parametrize("delay_ms,expected", [
+        (60_000.0, ["a", "b c", "word " * 30]),  # Shortest first
+        (0.0, ["word " * 30, "a", "b c"]),  # Everything overdue: oldest first
+    ])
+    def test_continuous_admission_order(self, delay_ms, expected):
+        """Test bucketing applies to admission through submit() and the worker."""
+        recorder = RecordingEngine()
+        engine = BatchInferenceEngine(recorder, BatchConfig(
+            max_batch_size=1,
+            enable_length_bucketing=True,
+            max_queue_delay_ms=delay_ms,
+        ))
+        prompts = ["word " * 30, "a", "b c"]
+        ids = [engine.submit_prompt(prompt, max_tokens=4) for prompt in prompts]
+
+        engine.start()
+        try:
+            assert all(engine.get_result(request_id, timeout=5).result for request_id in ids)
+        finally:
+            engine.stop()
+
+        assert list(recorder.chunks) == expected
@@ -0,0 +1,221 @@
+"""
+Inference Engine Tests
+======================
+
+Tests for src/core/engine/inference.py.
+"""
+
+import hashlib
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.core.engine.inference import (
+    GenerationConfig,
+    InferenceEngine,
+    StopReason,
+    StopSequenceMatcher,
+)
+
+
+@pytest.fixture
+def engine():
+    """Create an inference engine with mock model/tokenizer."""
+    return InferenceEngine(model=object(), tokenizer=object())
+
+
+def first_stop(text, sequences):
+    """Brute-force reference: earliest end, longest sequence on ties."""
+    for end in range(1, len(text) + 1):
+        hits = [s for s in sequences if s and text[:end].endswith(s)]
+        if hits:
+            return end - max(map(len, hits))
+    return -1
+
+
+class TestStopSequenceMatcher:
+    """Test Aho-Corasick stop sequence matching."""
+
+    @pytest.mark.parametrize("sequences,text,expected", [
+        (["END"], "the END is near", 4),
+        (["stop", "top"], "non-stop", 4),
+        (["abcd", "bc"], "xabcd", 2),  # "bc" completes first
+        (["he", "she", "hers"], "ushers", 1),
+        (["aab"], "aaab", 1),  # needs a failure link
+        (["\n\n", "###"], "line\n\nnext", 4),
+        (["zzz"], "no match here", -1),
+        ([], "anything", -1),
+        ([""], "anything", -1),
+    ])
+    def test_find(self, sequences, text, expected):
+        """Test first-completing match positions."""
+        assert StopSequenceMatcher(sequences).find(text) == expected
+
+    def test_matches_brute_force(self):
+        """Test random texts/sequences over a small alphabet agree with the reference."""
+        rng = random.Random(0)
+        for _ in range(300):
+            sequences = [
+                "".join(rng.choices("ab", k=rng.randint(1, 4)))
+                for _ in range(rng.randint(1, 4))
+            ]
+            text = "".join(rng.choices("abc", k=rng.randint(0, 20)))
+
+            assert StopSequenceMatcher(sequences).find(text) == first_stop(text, sequences)
+
+    def test_config_rebuilds_on_change(self):
+        """Test the compiled matcher is cached and rebuilt when sequences change."""
+        config = GenerationConfig(stop_sequences=["a"])
+        matcher = config.stop_matcher()
+
+        assert config.stop_matcher() is matcher
+        config.stop_sequences.append("b")
+        assert config.stop_matcher().sequences == ("a", "b")
+        assert GenerationConfig().stop_matcher() is None
+
+    def test_generate_truncates_at_stop(self):
+        """Test generation output is cut before the first stop sequence."""
+        tokenizer = SimpleNamespace(encode=lambda text: [ord(c) for c in text])
+        engine = InferenceEngine(object(), tokenizer)
+
+        result = engine.generate(
+            "hi", GenerationConfig(max_tokens=5, stop_sequences=["ted gen", "zzz"])
+        )
+
+        assert result.generated_text == "genera"
+        assert result.stop_reason is StopReason.STOP_SEQUENCE
+
+
+class TestSemanticHash:
+    """Test semantic hashing for RSU lookup."""
+
+    def test_security_mode_uses_sha256(self):
+        """Test security_mode keys RSUs by the first 8 bytes of SHA-256."""
+        engine = InferenceEngine(config={"security_mode": True})
+        tokens = list(range(-300, 300, 7))
+        expected = int.from_bytes(
+            hashlib.sha256(bytes(t % 256 for t in tokens[:128])).digest()[:8],
+            'little',
+        )
+
+        assert engine._compute_semantic_hash(tokens) == expected
+
+    def test_security_mode_follows_sigma_config(self):
+        """Test the engine defaults to its ΣLANG integration's mode."""
+        sigma = SimpleNamespace(config=SimpleNamespace(security_mode=True))
+
+        assert InferenceEngine(sigma_integration=sigma)._security_mode
+        assert not InferenceEngine(sigma_integration=sigma, config={"security_mode": False})._security_mode
+
+
+class FakeSigma:
+    """Minimal SigmaIntegration stand-in with a fixed set of cached RSUs."""
+
+    def __init__(self, rsus=None):
+        self.rsus = rsus or {}  # semantic hash -> cached tokens
+        self.lookups = []
+        self.stored = []
+
+    def warm_start_inference(self, semantic_hash, cache):
+        self.lookups.append(semantic_hash)
+        cached = self.rsus.get(semantic_hash)
+        return (cached, len(cached)) if cached else (None, 0)
+
+    def compress_context(self, tokens, conversation_id=None, auto_store_rsu=True):
+        self.stored.append(list(tokens))
+        result = SimpleNamespace(
+            compression_ratio=2.0,
+            rsu_reference=object(),
+            semantic_hash=len(self.stored),
+        )
+        return None, result
+
+
+PROMPT = "abcdefghijklmnopqrstuvwxyz"
+TOKENIZER = SimpleNamespace(encode=lambda text: [ord(c) for c in text])
+SIGMA_CONFIG = GenerationConfig(max_tokens=4, use_sigma_compression=True)
+
+
+class TestLSHIndex:
+    """Test the MinHash/LSH near-duplicate index."""
+
+    def test_index_is_bounded_lru(self):
+        """Test the index evicts least recently used RSUs past its cap."""
+        engine = InferenceEngine(object(), object(), config={"lsh_max_entries": 3})
+        signatures = {
+            h: engine._compute_minhash(list(range(h * 100, h * 100 + 20)))
+            for h in range(5)
+        }
+        for h in range(3):
+            engine._index_rsu(h, signatures[h])
+
+        # Touch 0 so 1 becomes least recently used
+        assert engine._find_similar_rsu(signatures[0], 0.9) == 0
+        engine._index_rsu(3, signatures[3])
+        engine._index_rsu(4, signatures[4])
+
+        assert list(engine._lsh_signatures) == [0, 3, 4]
+        indexed = {h for bucket in engine._lsh_buckets.values() for h in bucket}
+        assert indexed == {0, 3, 4}
+        assert engine._find_similar_rsu(signatures[1], 0.9) is None
+
+    def test_signature_covers_stored_tokens(self):
+        """Test the indexed signature is computed from the stored slice."""
+        tokens = TOKENIZER.encode(PROMPT)
+        engine = InferenceEngine(object(), TOKENIZER)
+        sigma = FakeSigma({engine._compute_semantic_hash(tokens): tokens[:10]})
+        engine._sigma = sigma
+
+        engine.generate(PROMPT, SIGMA_CONFIG)
+
+        stored = sigma.stored[0]
+        assert len(stored) == 16
+        assert np.array_equal(engine._lsh_signatures[1], engine._compute_minhash(stored))
+
+
+class TestWarmStart:
+    """Test RSU warm-start only skips a verified cached prefix."""
+
+    NEAR = 0xBEEF
+
+    def make_engine(self, rsus):
+        sigma = FakeSigma(rsus)
+        engine = InferenceEngine(object(), TOKENIZER, sigma_integration=sigma)
+        # Index PROMPT's own signature so the near-duplicate lookup hits NEAR
+        engine._index_rsu(self.NEAR, engine._compute_minhash(TOKENIZER.encode(PROMPT)))
+        return engine, sigma
+
+    def test_near_duplicate_with_matching_prefix(self):
+        """Test a near-duplicate whose cached prefix matches is reused."""
+        engine, sigma = self.make_engine({self.NEAR: TOKENIZER.encode(PROMPT)[:10]})
+
+        result = engine.generate(PROMPT, SIGMA_CONFIG)
+
+        assert sigma.lookups == [self.NEAR]
+        assert result.cache_warm_start_position == 10
+        assert sigma.stored[0] == TOKENIZER.encode(PROMPT)[10:]
+
+    def test_near_duplicate_with_different_prefix(self):
+        """Test a near-duplicate with another prefix falls back to the exact hash."""
+        engine, sigma = self.make_engine({self.NEAR: TOKENIZER.encode("zyxwvutsrq")})
+
+        result = engine.generate(PROMPT, SIGMA_CONFIG)
+
+        exact = engine._compute_semantic_hash(TOKENIZER.encode(PROMPT))
+        assert sigma.lookups == [self.NEAR, exact]
+        assert result.cache_warm_start_position == 0
+        assert sigma.stored[0] == TOKENIZER.encode(PROMPT)
+
+    def test_exact_hash_with_different_prefix(self):
+        """Test even an exact hash match is not reused past a prefix mismatch."""
+        tokens = TOKENIZER.encode(PROMPT)
+        engine = InferenceEngine(object(), TOKENIZER)
+        sigma = FakeSigma({engine._compute_semantic_hash(tokens): tokens[1:11]})
+        engine._sigma = sigma
+
+        result = engine.generate(PROMPT, SIGMA_CONFIG)
+
+        assert result.cache_warm_start_position == 0
+        assert sigma.stored[0] == tokens
@@ -4,7 +4,7 @@ RSU Storage Tests
 """
 
 import pytest
-from sigmavault.rsu import RSUStorage, RSURetriever, RSUStorageConfig
+from sigmavault.rsu import RSUStorage, RSURetriever, RSUStatus, StoreSpec
 
 
 class TestRSUStorage:
@@ -54,16 +54,70 @@ class TestRSUStorage:
     def test_find_similar(self, storage):
         """Test semantic similarity search."""
         # Store multiple RSUs
-        for i in range(5):
-            storage.store(
+        storage.store_many([
+            StoreSpec(
                 glyph_data=b"\x00\x01",
                 semantic_hash=0x1000 + i,
                 original_token_count=10,
             )
+            for i in range(5)
+        ])
         
         matches = storage.find_similar(0x1002, threshold=0.9)
         assert len(matches) > 0
     
+    def test_find_similar_ranking(self, storage):
+        """Test similarity results are thresholded and ranked by distance."""
+        base = 0xFFFF000000000000
+        entries = storage.store_many([
+            StoreSpec(glyph_data=b"\x00\x01", semantic_hash=h, original_token_count=10)
+            for h in (base ^ 0b111, base, base ^ 0b1, ~base & 0xFFFFFFFFFFFFFFFF)
+        ])
+        
+        matches = storage.find_similar(base, threshold=0.95)
+        assert [m.semantic_hash for m in matches] == [base, base ^ 0b1, base ^ 0b111]
+        
+        storage.delete(entries[1].rsu_id)
+        matches = storage.find_similar(base, threshold=0.95, max_results=1)
+        assert [m.semantic_hash for m in matches] == [base ^ 0b1]
+    
+    def test_find_nearest(self, storage):
+        """Test nearest lookup over quantized 8D coordinates."""
+        entries = storage.store_many([
+            StoreSpec(glyph_data=f"data_{i}".encode(), semantic_hash=0x1000 * (i + 1),
+                      original_token_count=10)
+            for i in range(4)
+        ])
+        
+        target = entries[2]
+        nearest = storage.find_nearest(target.vault_coordinates, max_results=2)
+        assert len(nearest) == 2
+        assert nearest[0].rsu_id == target.rsu_id
+        
+        storage.delete(target.rsu_id)
+        nearest = storage.find_nearest(target.vault_coordinates)
+        assert target.rsu_id not in [e.rsu_id for e in nearest]
+        assert len(nearest) == 3
+    
+    def test_store_many(self, storage):
+        """Test batch store matches individual stores."""
+        entries = storage.store_many([
+            StoreSpec(
+                glyph_data=f"data_{i}".encode(),
+                semantic_hash=0x2000 + i,
+                original_token_count=10,
+                kv_cache_data=b"\x00" * 100 if i == 1 else None,
+            )
+            for i in range(3)
+        ])
+        
+        assert [e.semantic_hash for e in entries] == [0x2000, 0x2001, 0x2002]
+        assert storage.get_statistics()["total_rsus"] == 3
+        for i, entry in enumerate(entries):
+            retrieved = storage.retrieve(entry.rsu_id)
+            assert retrieved.glyph_data == f"data_{i}".encode()
+        assert storage.retrieve(entries[1].rsu_id).kv_cache_data == b"\x00" * 100
+    
     def test_conversation_chain(self, storage):
         """Test conversation chaining."""
         conv_id = "conv_test_123"
@@ -82,6 +136,11 @@ class TestRSUStorage:
         
         chain = storage.get_conversation_chain(conv_id)
         assert len(chain) == 3
+        assert [e.semantic_hash for e in chain] == [0x1000, 0x1001, 0x1002]
+        
+        storage.delete(chain[1].rsu_id)
+        chain = storage.get_conversation_chain(conv_id)
+        assert [e.semantic_hash for e in chain] == [0x1000, 0x1002]
     
     def test_archive(self, storage):
         """Test archiving RSUs."""
@@ -95,6 +154,36 @@ class TestRSUStorage:
         
         # Archived RSUs can't be retrieved
         assert storage.retrieve(entry.rsu_id) is None
+        assert entry.status == RSUStatus.ARCHIVED
+        
+        assert storage.delete(entry.rsu_id)
+        assert storage.archive(entry.rsu_id) is False
+    
+    def test_inactive_not_retrievable(self, storage):
+        """Test expired and corrupted RSUs can't be retrieved."""
+        for status in (RSUStatus.EXPIRED, RSUStatus.CORRUPTED):
+            entry = storage.store(
+                glyph_data=b"\x00\x01",
+                semantic_hash=0x9ABC,
+                original_token_count=10,
+            )
+            entry.status = status
+            
+            assert storage.retrieve(entry.rsu_id) is None
+    
+    def test_reactivated_rsu_retrievable(self, storage):
+        """Test retrievability follows the entry status, not archive() history."""
+        entry = storage.store(
+            glyph_data=b"\x00\x01",
+            semantic_hash=0xDEF0,
+            original_token_count=10,
+        )
+        storage.archive(entry.rsu_id)
+        assert storage.retrieve(entry.rsu_id) is None
+        
+        entry.status = RSUStatus.ACTIVE
+        
+        assert storage.retrieve(entry.rsu_id).glyph_data == b"\x00\x01"
     
     def test_statistics(self, storage):
         """Test statistics retrieval."""
@@ -0,0 +1,184 @@
+"""
+Security Hardening Tests
+========================
+
+Tests for sigmavault/security/hardening.py.
+"""
+
+import threading
+import time
+
+import pytest
+
+from sigmavault.security import hardening
+from sigmavault.security import MemoryBoundedBuffer, RWLock, verify_hardening
+
+
+def start_thread(target):
+    """Start a daemon thread running target."""
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    return thread
+
+
+class TestRWLock:
+    """Test reader/writer exclusion."""
+
+    def test_readers_share(self):
+        """Test two readers hold the lock at the same time."""
+        lock = RWLock()
+        both_inside = threading.Barrier(2, timeout=2)
+
+        def reader():
+            lock.acquire_read()
+            try:
+                both_inside.wait()
+            finally:
+                lock.release_read()
+
+        threads = [start_thread(reader) for _ in range(2)]
+        for thread in threads:
+            thread.join(timeout=2)
+
+        assert not both_inside.broken
+        assert lock._state == 0
+
+    def test_writer_excludes_readers(self):
+        """Test a reader waits until the writer releases."""
+        lock = RWLock()
+        acquired = threading.Event()
+        lock.acquire_write()
+
+        def reader():
+            lock.acquire_read()
+            acquired.set()
+            lock.release_read()
+
+        thread = start_thread(reader)
+        assert not acquired.wait(0.1)
+
+        lock.release_write()
+        assert acquired.wait(2)
+        thread.join(timeout=2)
+
+    def test_writer_waits_for_readers(self):
+        """Test a writer waits until every reader releases."""
+        lock = RWLock()
+        acquired = threading.Event()
+        lock.acquire_read()
+        lock.acquire_read()
+
+        def writer():
+            lock.acquire_write()
+            acquired.set()
+            lock.release_write()
+
+        thread = start_thread(writer)
+        lock.release_read()
+        assert not acquired.wait(0.1)
+
+        lock.release_read()
+        assert acquired.wait(2)
+        thread.join(timeout=2)
+
+    def test_waiting_writer_blocks_new_readers(self):
+        """Test new readers queue behind a waiting writer."""
+        lock = RWLock()
+        order = []
+        lock.acquire_read()
+
+        def writer():
+            lock.acquire_write()
+            order.append("writer")
+            lock.release_write()
+
+        def reader():
+            lock.acquire_read()
+            order.append("reader")
+            lock.release_read()
+
+        writer_thread = start_thread(writer)
+        while not lock._writers_waiting:
+            time.sleep(0.001)
+        reader_thread = start_thread(reader)
+        time.sleep(0.05)
+        assert order == []
+
+        lock.release_read()
+        writer_thread.join(timeout=2)
+        reader_thread.join(timeout=2)
+        assert order == ["writer", "reader"]
+
+
+class TestMemoryBoundedBuffer:
+    """Test chunk tracking by identity."""
+
+    def test_free_in_any_order(self):
+        """Test chunks free independently of allocation order."""
+        buffer = MemoryBoundedBuffer(max_size=1024)
+        chunks = [
+            buffer.allocate_chunk(100),
+            buffer.allocate_chunk(200),
+            buffer.allocate_chunk(300),
+        ]
+
+        buffer.free_chunk(chunks[1])
+        assert buffer.current_size == 400
+        buffer.free_chunk(chunks[0])
+        buffer.free_chunk(chunks[2])
+        assert buffer.current_size == 0
+
+    def test_free_looks_up_by_identity(self):
+        """Test an equal but untracked buffer is not freed."""
+        buffer = MemoryBoundedBuffer(max_size=1024)
+        chunk = buffer.allocate_chunk(64)
+
+        buffer.free_chunk(bytearray(64))
+        assert buffer.current_size == 64
+
+        buffer.free_chunk(chunk)
+        buffer.free_chunk(chunk)  # Double free is a no-op
+        assert buffer.current_size == 0
+
+    def test_freed_space_is_reusable(self):
+        """Test freeing a chunk makes room for a new allocation."""
+        buffer = MemoryBoundedBuffer(max_size=256)
+        chunk = buffer.allocate_uninit(256)
+        with pytest.raises(MemoryError):
+            buffer.allocate_chunk(1)
+
+        buffer.free_chunk(chunk)
+
+        assert len(buffer.allocate_chunk(256)) == 256
+
+
+class TestVerifyHardening:
+    """Test the concurrent verification run."""
+
+    def test_matches_sequential_baseline(self, capsys):
+        """Test the concurrent run reports what running checks in order does."""
+        sequential = {
+            check[0]: hardening._run_check(check) for check in hardening._HARDENING_CHECKS
+        }
+
+        assert verify_hardening() is all(sequential.values())
+        out = capsys.readouterr().out
+        for name, passed in sequential.items():
+            assert f"{name:20s} {'✅ PASS' if passed else '❌ FAIL'}" in out
+
+    def test_reports_failing_check(self, monkeypatch, capsys):
+        """Test one failing or raising check fails the whole verification."""
+        def boom():
+            raise RuntimeError("boom")
+
+        checks = hardening._HARDENING_CHECKS + (
+            ('always_false', lambda: False),
+            ('raises', boom),
+        )
+        monkeypatch.setattr(hardening, '_HARDENING_CHECKS', checks)
+
+        assert verify_hardening() is False
+        out = capsys.readouterr().out
+        assert "raises test failed: boom" in out
+        assert f"{'always_false':20s} ❌ FAIL" in out
+        assert f"{'rwlock':20s} ✅ PASS" in out
@@ -291,6 +291,24 @@ class TestHolographicRedundancy(unittest.TestCase):
         reconstructed = self.holographic.reconstruct(shards, len(data))
         
         self.assertEqual(reconstructed, data)
+    
+    def test_shards_do_not_alias_mutable_input(self):
+        """Writes to a bytearray after sharding do not change the shards."""
+        data = bytearray(b"Mutable data for sharding")
+        
+        shards = self.holographic.create_shards(data, num_shards=5)
+        data[:] = bytes(len(data))
+        
+        self.assertEqual(
+            self.holographic.reconstruct([bytes(s) for s in shards], len(data)),
+            b"Mutable data for sharding",
+        )
+    
+    def test_shards_of_bytes_are_read_only(self):
+        """Shards aliasing immutable input cannot be written through."""
+        shards = self.holographic.create_shards(b"0123456789abcdef", num_shards=4)
+        
+        self.assertTrue(all(s.readonly for s in shards))
 
 
 class TestKeyState(unittest.TestCase):
@@ -328,6 +346,24 @@ class TestKeyState(unittest.TestCase):
         state2 = self.KeyState.derive(secrets.token_bytes(64))
         
         self.assertNotEqual(state1.master_seed, state2.master_seed)
+    
+    def test_clear_cache(self):
+        """Clearing the derivation cache empties it without changing derived state."""
+        from sigmavault.core.dimensional_scatter import _expand_hybrid_key
+        master_key = secrets.token_bytes(64)
+        
+        state1 = self.KeyState.derive(master_key)
+        self.assertGreater(_expand_hybrid_key.cache_info().currsize, 0)
+        
+        self.KeyState.clear_cache()
+        self.assertEqual(_expand_hybrid_key.cache_info().currsize, 0)
+        
+        misses = _expand_hybrid_key.cache_info().misses
+        state2 = self.KeyState.derive(master_key)
+        self.assertEqual(_expand_hybrid_key.cache_info().misses, misses + 1)
+        
+        self.assertEqual(state1, state2)
+        self.assertIsNot(state1, state2)
 
 
 class TestTransactionManager(unittest.TestCase):
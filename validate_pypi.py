@@ -1,11 +1,27 @@
 #!/usr/bin/env python3
 """PyPI metadata validation for sigmavault."""
 
-import toml
 import re
+import sys
 
-with open('pyproject.toml', 'r') as f:
-    config = toml.load(f)
+if sys.version_info >= (3, 11):
+    import tomllib
+    with open('pyproject.toml', 'rb') as f:
+        config = tomllib.load(f)
+else:
+    import toml
+    with open('pyproject.toml', 'r') as f:
+        config = toml.load(f)
+
+# Canonical PEP 440 public version with optional local label
+_PEP440 = re.compile(
+    r'^([1-9][0-9]*!)?(0|[1-9][0-9]*)(\.(0|[1-9][0-9]*))*'
+    r'((a|b|c|rc|alpha|beta|pre|preview)(0|[1-9][0-9]*))?'
+    r'(\.post(0|[1-9][0-9]*))?'
+    r'(\.dev(0|[1-9][0-9]*))?'
+    r'(\+[a-z0-9]+(\.[a-z0-9]+)*)?$',
+    re.IGNORECASE,
+)
 
 project = config.get('project', {})
 build = config.get('build-system', {})
@@ -34,8 +50,7 @@ for field, value in required.items():
 
 # 2. PEP 440 VERSION CHECK
 version = project.get('version', '')
-pep440_pattern = r'^(\d+!)?(\d+)(\.\d+)*(a|b|rc)?(\d+)?$'
-is_pep440 = bool(re.match(pep440_pattern, version))
+is_pep440 = bool(_PEP440.match(version))
 print()
 print('2. VERSION COMPLIANCE (PEP 440):')
 print('-' * 80)
@@ -97,12 +112,23 @@ print()
 print('6. CLASSIFIERS SUMMARY:')
 print('-' * 80)
 classifiers = project.get('classifiers', [])
+# Partition classifiers by top-level category in a single pass
+buckets = {
+    'Development Status': [],
+    'Programming Language': [],
+    'Topic': [],
+    'Operating System': [],
+}
+for c in classifiers:
+    bucket = buckets.get(c.split(' :: ', 1)[0])
+    if bucket is not None:
+        bucket.append(c)
+dev_status = buckets['Development Status']
+py_versions = buckets['Programming Language']
+topics = buckets['Topic']
+os_list = buckets['Operating System']
+
 if classifiers:
-    dev_status = [c for c in classifiers if c.startswith('Development Status')]
-    py_versions = [c for c in classifiers if c.startswith('Programming Language')]
-    topics = [c for c in classifiers if c.startswith('Topic')]
-    os_list = [c for c in classifiers if c.startswith('Operating System')]
-    
     print(f'  ✓ Total classifiers: {len(classifiers)}')
     print(f'    • Development Status: {dev_status[0] if dev_status else "NOT SET"}')
     print(f'    • Python versions: {len(py_versions)} specified')
@@ -124,10 +150,9 @@ for req in requires:
 print()
 print('8. PLATFORM SUPPORT CHECK:')
 print('-' * 80)
-os_support = [c for c in classifiers if c.startswith('Operating System')]
-has_windows = any('Windows' in c for c in os_support)
-has_linux = any('Linux' in c for c in os_support)
-has_macos = any('Mac' in c for c in os_support)
+has_windows = any('Windows' in c for c in os_list)
+has_linux = any('Linux' in c for c in os_list)
+has_macos = any('Mac' in c for c in os_list)
 
 print(f'  Windows: {"✓" if has_windows else "⚠ NOT DECLARED"}')
 print(f'  Linux:   {"✓" if has_linux else "⚠ NOT DECLARED"}')